@@ -54,8 +54,10 @@ gc.map_draw(
 
 
 
-#Step 2: Choose a day and calculate
-U1, V1 = gc.geostrophic_current(data_draw, lat_t, dx_t, dy_t, sin_t, cos_t)
+#Step 2: Calculate all the days at once (ntime, ny, nx) and choose a day
+ssh[:, mask_t==0] = np.nan
+U, V = gc.geostrophic_current(ssh, lat_t, dx_t, dy_t, sin_t, cos_t)
+U1, V1 = U[0], V[0]
 
 for i in range(0,11):
     print (i*10,  np.nanpercentile(U1, i*10),np.nanpercentile(V1, i*10))
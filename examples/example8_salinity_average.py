@@ -62,20 +62,16 @@ gc.map_draw_box(
 # data_draw shape = (number of points, number of days)
 sal_surface = gc.import_surface(path, 'sal', tstart, tend, ignore_missing='False')
 
-# Step 4: Calculate salinity mean
-sal_mean = np.zeros((len(lon_min_box), (tend-tstart).days +1    ))
-
-for i in range(0, len(lat_min_box)):
-    sal_mean[i,:] = gc.spatial_average(sal_surface,
-        dxy_t,
-        mask_ocean=mask_t,
-        lon_t=lon_t,
-        lat_t=lat_t,
-        lon_min=lon_min_box[i],
-        lon_max=lon_max_box[i],
-        lat_min=lat_min_box[i],
-        lat_max=lat_max_box[i],   
-    )
+# Step 4: Calculate salinity mean of all the boxes in one pass
+# sal_mean shape = (number of boxes, number of days)
+boxes = list(zip(lon_min_box, lon_max_box, lat_min_box, lat_max_box))
+sal_mean = gc.spatial_average_regions(sal_surface,
+    dxy_t,
+    boxes,
+    mask_ocean=mask_t,
+    lon_t=lon_t,
+    lat_t=lat_t,
+)
 
 
 
@@ -14,23 +14,45 @@ _EXPORTS = {
     "import_surface": ".modules.import_series_daily",
     "import_layer": ".modules.import_series_daily",
     "import_depth": ".modules.import_series_daily",
+    "import_many": ".modules.import_series_daily",
+    "iter_days": ".modules.import_series_daily",
     "import_point": ".modules.import_series_daily",
     "import_profile": ".modules.import_series_daily",
+    "import_section_series": ".modules.import_series_daily",
     "import_section": ".modules.import_daily",
+    "SectionOperator": ".modules.import_daily",
+    "open_grid": ".modules.grid",
+    "Grid": ".modules.grid",
+    "spatial_index": ".modules.grid",
 
     # post-processing functions
     "interpolate_to_t": ".modules.interpolate_to_t",
     "interpolate_depth": ".modules.vertical_interpolation",
     "geostrophic_current": ".modules.geostrophic_current",
     "spatial_average": ".modules.spatial_average",
+    "Region": ".modules.spatial_average",
+    "spatial_average_regions": ".modules.spatial_average",
     "monthly_mean": ".modules.temporal_mean",
     "annual_mean": ".modules.temporal_mean",
+    "seasonal_mean": ".modules.temporal_mean",
+    "weekly_mean": ".modules.temporal_mean",
+    "resample_mean": ".modules.temporal_mean",
+    "daily_climatology": ".modules.temporal_mean",
+    "monthly_climatology": ".modules.temporal_mean",
+    "anomaly": ".modules.temporal_mean",
+    "temporal_quantile": ".modules.temporal_quantile",
+    "RunningMean": ".modules.running_stats",
+    "RunningVariance": ".modules.running_stats",
+    "RunningMinMax": ".modules.running_stats",
+    "RunningHistogram": ".modules.running_stats",
 
     # plot-related functions
     "map_draw": ".modules.map_plot",
     "map_draw_point": ".modules.map_plot",
     "map_draw_uv": ".modules.map_plot",
     "map_draw_box": ".modules.map_plot",
+    "cached_basemap": ".modules.map_plot",
+    "clear_basemap_cache": ".modules.map_plot",
     "plot_point": ".modules.time_series_plot",
     "plot_point_monthly": ".modules.time_series_plot",
     "plot_heatmap": ".modules.heatmap_plot",
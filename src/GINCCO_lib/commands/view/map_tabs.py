@@ -11,6 +11,7 @@ from netCDF4 import Dataset
 from GINCCO_lib.commands.view.plot_scalar_map import draw_map_plot
 from GINCCO_lib.commands.view.plot_vector_map import draw_vector_plot
 from GINCCO_lib.commands.view.plot_combine_map import draw_map_combine
+from GINCCO_lib.modules.grid import open_grid
 
 
 def _safe_float(value):
@@ -74,30 +75,28 @@ def _load_grid(gridfile, suffix="t"):
     if not gridfile:
         return state
     try:
-        with Dataset(gridfile) as grid:
-            lon = grid.variables.get("longitude_{}".format(suffix))
-            if lon is None:
-                lon = grid.variables.get("longitude_t")
-            lat = grid.variables.get("latitude_{}".format(suffix))
-            if lat is None:
-                lat = grid.variables.get("latitude_t")
-            depth = grid.variables.get("depth_{}".format(suffix))
-            if depth is None:
-                depth = grid.variables.get("depth_t")
-            mask = grid.variables.get("mask_{}".format(suffix))
-            if mask is None:
-                mask = grid.variables.get("mask_t")
-            sin_t = grid.variables.get("gridrotsin_t")
-            cos_t = grid.variables.get("gridrotcos_t")
-
-            state["lon"] = lon[:] if lon is not None else None
-            state["lat"] = lat[:] if lat is not None else None
-            state["depth_levels"] = depth[:] if depth is not None else None
-            if mask is not None:
-                mask_arr = mask[:]
-                state["mask_t"] = mask_arr if mask_arr.ndim == 2 else mask_arr[0, :, :]
-            state["sin_t"] = sin_t[:] if sin_t is not None else None
-            state["cos_t"] = cos_t[:] if cos_t is not None else None
+        # The grid is read once per process and shared with the other tabs
+        grid = open_grid(gridfile)
+        lon = grid.get("longitude_{}".format(suffix))
+        if lon is None:
+            lon = grid.get("longitude_t")
+        lat = grid.get("latitude_{}".format(suffix))
+        if lat is None:
+            lat = grid.get("latitude_t")
+        depth = grid.get("depth_{}".format(suffix))
+        if depth is None:
+            depth = grid.get("depth_t")
+        mask = grid.get("mask_{}".format(suffix))
+        if mask is None:
+            mask = grid.get("mask_t")
+
+        state["lon"] = lon
+        state["lat"] = lat
+        state["depth_levels"] = depth
+        if mask is not None:
+            state["mask_t"] = mask if mask.ndim == 2 else mask[0, :, :]
+        state["sin_t"] = grid.get("gridrotsin_t")
+        state["cos_t"] = grid.get("gridrotcos_t")
     except Exception:
         pass
     return state
@@ -10,6 +10,7 @@ from netCDF4 import Dataset
 
 from GINCCO_lib.commands.view.plot_vector_map import draw_vector_plot
 from GINCCO_lib.modules.geostrophic_current import geostrophic_current
+from GINCCO_lib.modules.grid import open_grid
 
 
 def _safe_float(value):
@@ -69,21 +70,20 @@ def _load_grid(gridfile):
     if not gridfile:
         return state
     try:
-        with Dataset(gridfile) as grid:
-            for key, var_name in (
-                ("lon", "longitude_t"),
-                ("lat", "latitude_t"),
-                ("dx", "dx_t"),
-                ("dy", "dy_t"),
-                ("sin", "gridrotsin_t"),
-                ("cos", "gridrotcos_t"),
-            ):
-                var = grid.variables.get(var_name)
-                state[key] = var[:] if var is not None else None
-            mask = grid.variables.get("mask_t")
-            if mask is not None:
-                mask_arr = mask[:]
-                state["mask"] = mask_arr if mask_arr.ndim == 2 else mask_arr[0, :, :]
+        # The grid is read once per process and shared with the other tabs
+        grid = open_grid(gridfile)
+        for key, var_name in (
+            ("lon", "longitude_t"),
+            ("lat", "latitude_t"),
+            ("dx", "dx_t"),
+            ("dy", "dy_t"),
+            ("sin", "gridrotsin_t"),
+            ("cos", "gridrotcos_t"),
+        ):
+            state[key] = grid.get(var_name)
+        mask = grid.get("mask_t")
+        if mask is not None:
+            state["mask"] = mask if mask.ndim == 2 else mask[0, :, :]
     except Exception:
         pass
     return state
@@ -2,7 +2,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.colors as mcolors
-from mpl_toolkits.basemap import Basemap
+from GINCCO_lib.modules.map_plot import cached_basemap
 from GINCCO_lib.modules.interpolate_to_t import interpolate_to_t
 
 try:
@@ -206,15 +206,7 @@ def draw_map_combine(scalar_name, scalar_var, u, v, lon, lat, opts, state):
     plt.close("all")
     fig, ax = plt.subplots(figsize=(fig_width, fig_height), dpi=dpi)
 
-    m = Basemap(
-        projection="merc",
-        llcrnrlon=lon_min,
-        urcrnrlon=lon_max,
-        llcrnrlat=lat_min,
-        urcrnrlat=lat_max,
-        resolution=resolution,
-        ax=ax,
-    )
+    m = cached_basemap(lon_min, lon_max, lat_min, lat_max, resolution=resolution, ax=ax)
 
     # Vẽ scalar background
     cs = m.pcolormesh(
@@ -282,9 +274,9 @@ def draw_map_combine(scalar_name, scalar_var, u, v, lon, lat, opts, state):
     # interpolate staggered fields to T-grid if shapes don't match
     try:
         if u.shape != mask_t.shape:
-            u = interpolate_to_t(u, stagger="u", mask_t=mask_t)[0]
+            u = interpolate_to_t(u, stagger="u", mask_t=mask_t, single_src=False)[0]
         if v.shape != mask_t.shape:
-            v = interpolate_to_t(v, stagger="v", mask_t=mask_t)[0]
+            v = interpolate_to_t(v, stagger="v", mask_t=mask_t, single_src=False)[0]
     except Exception as e:
         print("Interpolation error:", e)
         return
@@ -1,7 +1,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.colors as mcolors
-from mpl_toolkits.basemap import Basemap
+from GINCCO_lib.modules.map_plot import cached_basemap
 from GINCCO_lib.modules.vertical_interpolation import interpolate_depth
 
 
@@ -261,13 +261,7 @@ def draw_map_plot(varname, var, lon, lat, options, state=None):
     # --- 2D+ map ---
     fig, ax = plt.subplots(figsize=(fig_width, fig_height), dpi=dpi)
 
-    m = Basemap(
-        projection="merc",
-        llcrnrlon=lon_min, urcrnrlon=lon_max,
-        llcrnrlat=lat_min, urcrnrlat=lat_max,
-        resolution=resolution,
-        ax=ax,
-    )
+    m = cached_basemap(lon_min, lon_max, lat_min, lat_max, resolution=resolution, ax=ax)
 
     cs = m.pcolormesh(
         lon, lat, data,
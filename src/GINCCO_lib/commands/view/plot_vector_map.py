@@ -2,7 +2,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.colors as mcolors
 from GINCCO_lib.modules.interpolate_to_t import interpolate_to_t
-from mpl_toolkits.basemap import Basemap
+from GINCCO_lib.modules.map_plot import cached_basemap
 
 try:
     from scipy.spatial import cKDTree as KDTree
@@ -143,9 +143,9 @@ def draw_vector_plot(u, v, lon, lat, opts, state, quiver_max_n=10):
     # interpolate staggered fields to T-grid if shapes don't match
     try:
         if u.shape != mask_t.shape:
-            u = interpolate_to_t(u, stagger="u", mask_t=mask_t)[0]
+            u = interpolate_to_t(u, stagger="u", mask_t=mask_t, single_src=False)[0]
         if v.shape != mask_t.shape:
-            v = interpolate_to_t(v, stagger="v", mask_t=mask_t)[0]
+            v = interpolate_to_t(v, stagger="v", mask_t=mask_t, single_src=False)[0]
     except Exception as e:
         print("Interpolation error:", e)
         return
@@ -222,12 +222,7 @@ def draw_vector_plot(u, v, lon, lat, opts, state, quiver_max_n=10):
         lat_max += pad
 
 
-    m = Basemap(
-        projection="merc",
-        llcrnrlon=lon_min, urcrnrlon=lon_max,
-        llcrnrlat=lat_min, urcrnrlat=lat_max,
-        resolution=opts.get("resolution", "i"), ax=ax
-    )
+    m = cached_basemap(lon_min, lon_max, lat_min, lat_max, resolution=opts.get("resolution", "i"), ax=ax)
 
     if fill_continents:
         m.fillcontinents(color=continent_color, lake_color=lake_color, zorder=10)
@@ -9,6 +9,7 @@ import matplotlib.cm as cm
 import numpy as np
 from netCDF4 import Dataset
 
+from GINCCO_lib.modules.grid import open_grid
 from GINCCO_lib.modules.map_plot import map_draw_point
 from GINCCO_lib.modules.section_plot import draw_section_figure
 
@@ -44,21 +45,16 @@ def get_grid_coords(grid_file, suffix):
         return None, None, None, None
 
     try:
-        with Dataset(grid_file) as grid:
-            try:
-                lon = grid.variables["longitude_{}".format(suffix)][:]
-                lat = grid.variables["latitude_{}".format(suffix)][:]
-                depth = grid.variables["depth_{}".format(suffix)][:]
-                mask = grid.variables["mask_{}".format(suffix)][:]
-            except KeyError:
-                lon_var = grid.variables.get("longitude_t")
-                lat_var = grid.variables.get("latitude_t")
-                depth_var = grid.variables.get("depth_t")
-                mask_var = grid.variables.get("mask_t")
-                lon = lon_var[:] if lon_var is not None else None
-                lat = lat_var[:] if lat_var is not None else None
-                depth = depth_var[:] if depth_var is not None else None
-                mask = mask_var[:] if mask_var is not None else None
+        # The grid is read once per process and shared with the other tabs
+        grid = open_grid(grid_file)
+        names = ["{}_{}".format(prefix, suffix) for prefix in ("longitude", "latitude", "depth", "mask")]
+        if all(name in grid for name in names):
+            lon, lat, depth, mask = (grid[name] for name in names)
+        else:
+            lon = grid.get("longitude_t")
+            lat = grid.get("latitude_t")
+            depth = grid.get("depth_t")
+            mask = grid.get("mask_t")
 
         if mask is not None and getattr(mask, "ndim", 0) == 3:
             mask = mask[0, :, :]
@@ -1,58 +1,90 @@
 import numpy as np
 
-def geostrophic_current(ssh, lat, dx, dy, sin_t, cos_t):
+from GINCCO_lib.modules.helpers import _is_in_memory, _time_chunks
+
+
+def _coriolis_factor(lat, g=9.81, omega=7.292115e-5):
+    """Return g/f on the grid, NaN near the equator (|f| < 1e-5) where the geostrophic balance is not used."""
+    # Compute Coriolis parameter (same shape as grid)
+    f = 2 * omega * np.sin(np.deg2rad(lat))
+    with np.errstate(divide='ignore'):
+        factor = g / f
+    factor[np.abs(f) < 1e-5] = np.nan
+    return factor
+
+
+def _geostrophic_block(ssh, factor, dx, dy, sin_t, cos_t):
+    """Geostrophic currents of a (..., ny, nx) block of SSH fields, see geostrophic_current."""
+    # Gradients of SSH (finite differences) along y and x, for all fields at once
+    dssh_dy, dssh_dx = np.gradient(ssh, axis=(-2, -1))
+    dssh_dx /= dx
+    dssh_dy /= dy
+
+    # Geostrophic currents (NaN near the equator through factor), in place
+    u = np.multiply(dssh_dy, factor, out=dssh_dy)
+    np.negative(u, out=u)
+    v = np.multiply(dssh_dx, factor, out=dssh_dx)
+
+    # Mask invalid data
+    invalid = np.isnan(ssh)
+    u[invalid] = np.nan
+    v[invalid] = np.nan
+
+    #Rotate to N-S
+    U1 =  u * cos_t + v * sin_t
+    V1 = -u * sin_t + v * cos_t
+    return U1, V1
+
+
+def geostrophic_current(ssh, lat, dx, dy, sin_t, cos_t, chunk_days=None):
     """
     Compute geostrophic currents when dx, dy (in meters) are already known.
 
+    A whole time series of SSH fields is computed in one vectorized pass. The
+    Coriolis factor g/f and the equatorial mask are computed once from `lat`.
+
     Parameters
     ----------
-    ssh : 2D array [m]
-        Sea surface height.
+    ssh : 2D or 3D array [m]
+        Sea surface height, (ny, nx) or (ntime, ny, nx). On-disk arrays
+        (np.memmap, netCDF variable) are read chunk by chunk over time.
     lat : 2D array [deg]
-        Latitude (only used to mask low-latitude values if needed).
-    f : 2D array [s^-1]
-        Coriolis parameter (2*omega*sin(lat)).
+        Latitude, used for the Coriolis parameter f = 2*omega*sin(lat).
+        Values with |f| < 1e-5 (near the equator) are masked.
     dx, dy : 2D arrays [m]
         Grid spacing in x (zonal) and y (meridional) directions.
+    sin_t, cos_t : 2D arrays
+        Sine and cosine of the grid rotation angle, used to rotate the
+        currents to the east/north directions.
+    chunk_days : int, optional
+        Number of SSH fields computed at once, to bound the memory of the
+        temporary arrays for long series. Default None computes an in-memory
+        array in one pass, and reads on-disk arrays 31 days at a time.
 
     Returns
     -------
-    u, v : 2D arrays [m/s]
-        Eastward (u) and northward (v) geostrophic velocities.
+    u, v : 2D or 3D arrays [m/s]
+        Eastward (u) and northward (v) geostrophic velocities, with the shape of ssh.
     """
-    g = 9.81
-    omega = 7.292115e-5
-
-    ssh = np.asarray(np.ma.filled(ssh, np.nan), dtype=float)
     lat = np.asarray(np.ma.filled(lat, np.nan), dtype=float)
     dx = np.asarray(np.ma.filled(dx, np.nan), dtype=float)
     dy = np.asarray(np.ma.filled(dy, np.nan), dtype=float)
     sin_t = np.asarray(np.ma.filled(sin_t, np.nan), dtype=float)
     cos_t = np.asarray(np.ma.filled(cos_t, np.nan), dtype=float)
 
-    # Compute Coriolis parameter (same shape as grid)
-    f = 2 * omega * np.sin(np.deg2rad(lat))
-
-    # Gradients of SSH (finite differences)
-    dssh_dy, dssh_dx = np.gradient(ssh)
-    dssh_dx = dssh_dx / dx
-    dssh_dy = dssh_dy / dy
-
-    # Geostrophic currents
-    u = -g / f * dssh_dy
-    v =  g / f * dssh_dx
+    # Computed once for all the time steps
+    factor = _coriolis_factor(lat)
 
-    # Mask near equator and invalid data
-    u[np.abs(f) < 1e-5] = np.nan
-    v[np.abs(f) < 1e-5] = np.nan
-    u[np.isnan(ssh)] = np.nan
-    v[np.isnan(ssh)] = np.nan
-
-    #Rotate to N-S
-    U1 =  u * cos_t + v * sin_t
-    V1 = -u * sin_t + v * cos_t
+    if not hasattr(ssh, 'shape'):
+        ssh = np.asarray(ssh)
+    if len(ssh.shape) == 2 or (chunk_days is None and _is_in_memory(ssh)):
+        ssh = np.asarray(np.ma.filled(ssh, np.nan), dtype=float)
+        return _geostrophic_block(ssh, factor, dx, dy, sin_t, cos_t)
 
+    # Chunked mode: only chunk_days SSH fields (and their temporaries) at once
+    U1 = np.empty(ssh.shape, dtype=float)
+    V1 = np.empty(ssh.shape, dtype=float)
+    for i0, block in _time_chunks(ssh, chunk_days or 31):
+        i1 = i0 + block.shape[0]
+        U1[i0:i1], V1[i0:i1] = _geostrophic_block(block.astype(float, copy=False), factor, dx, dy, sin_t, cos_t)
     return U1, V1
-
-
-
@@ -0,0 +1,231 @@
+import os
+import weakref
+
+import numpy as np
+from netCDF4 import Dataset
+from scipy.spatial import cKDTree
+
+#############################
+'''
+This module gives a shared access to the grid file (grid.nc).
+
+List of functions:
+* open_grid: return the Grid of a run, opened once per process
+* Grid: lazily load and cache the variables of grid.nc (depth_*, mask_*, latitude_*, longitude_*, ...)
+* spatial_index: KD-tree of the grid nodes, to find the nearest nodes of many points at once
+
+Features:
+* Each variable is read from the disk only the first time it is used
+* The same Grid object is returned for the same grid.nc, so repeated calls in a notebook do not read the grid again
+* Automatically choose the grid suffix of a variable (_t, _u, _v, _w, _f), like the import functions
+'''
+#############################
+
+
+_GRIDS = {}
+_INDEXES = {}
+
+
+def _grid_file(path):
+    """Return the grid.nc path, from either a directory or the grid file itself."""
+    if os.path.isdir(path):
+        path = os.path.join(path, 'grid.nc')
+    return os.path.abspath(path)
+
+
+class Grid:
+    """
+    Lazily loaded and cached content of a grid.nc file.
+
+    Variables are read with ``grid['depth_t']`` the first time they are used
+    and then kept in memory. The cached arrays are read-only: copy them before
+    modifying them.
+
+    Parameters
+    ----------
+    path : str
+        Directory containing grid.nc, or the path of the grid file.
+
+    Examples
+    --------
+    >>> grid = open_grid(path)
+    >>> depth_u = grid.variable('depth', 'veloc_u')   # depth_u
+    >>> mask_t = grid.mask('sal')                     # mask_t[0] (2D)
+    """
+
+    def __init__(self, path):
+        self.path = _grid_file(path)
+        self.mtime = os.path.getmtime(self.path)
+        with Dataset(self.path, 'r') as fgrid:
+            self.names = set(fgrid.variables)
+        self._cache = {}
+
+    def __repr__(self):
+        return 'Grid(%r, loaded=%s)' % (self.path, sorted(self._cache))
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def __getitem__(self, name):
+        if name not in self._cache:
+            with Dataset(self.path, 'r') as fgrid:
+                values = fgrid.variables[name][:]
+            if isinstance(values, np.ndarray):
+                values.flags.writeable = False
+            self._cache[name] = values
+        return self._cache[name]
+
+    def get(self, name, default=None):
+        """Return the variable `name`, or `default` if it is not in the grid file."""
+        if name not in self:
+            return default
+        return self[name]
+
+    def variable(self, prefix, var):
+        """Return the grid variable `prefix` on the grid of `var`, e.g. variable('depth', 'veloc_u') → depth_u."""
+        suffix = str(var)[-1]
+        name = '%s_%s' % (prefix, suffix)
+        if name not in self:
+            print('Could not find a grid suffix for %s. Using _t as default.' % (var))
+            name = '%s_t' % (prefix)
+        return self[name]
+
+    def mask(self, var='t'):
+        """
+        Return the 2D land-sea mask on the grid of `var`.
+
+        For a 3D mask this is level 0, the bottom level of the model (the
+        surface is level -1), as used by import_depth and the examples.
+        """
+        mask_ = self.variable('mask', var)
+        if mask_.ndim == 3:
+            return mask_[0, :, :]
+        return mask_
+
+    def clear(self):
+        """Drop all cached variables, so they are read again from the disk."""
+        self._cache.clear()
+
+
+def open_grid(path, reload=False):
+    """
+    Return the Grid of a run, opened only once per process.
+
+    Parameters
+    ----------
+    path : str
+        Directory containing grid.nc, or the path of the grid file.
+    reload : bool, optional
+        If True, forget the cached Grid and read the grid file again.
+        The grid is also reloaded automatically if the file was modified.
+
+    Returns
+    -------
+    Grid
+        The shared Grid object of this grid file.
+    """
+    fname = _grid_file(path)
+    grid = _GRIDS.get(fname)
+    if reload or grid is None or grid.mtime != os.path.getmtime(fname):
+        grid = Grid(fname)
+        _GRIDS[fname] = grid
+    return grid
+
+
+def _as_grid(grid, path):
+    """Return `grid` if it is a Grid, else the shared Grid of `grid` (a path) or of `path`."""
+    if isinstance(grid, Grid):
+        return grid
+    return open_grid(grid if grid is not None else path)
+
+
+#############################
+
+
+def _unit_sphere(lat, lon):
+    """Convert latitude/longitude (degrees) to (x, y, z) points on the unit sphere."""
+    lat_rad = np.radians(lat)
+    lon_rad = np.radians(lon)
+    return np.stack([np.cos(lat_rad) * np.cos(lon_rad),
+                     np.cos(lat_rad) * np.sin(lon_rad),
+                     np.sin(lat_rad)], axis=-1)
+
+
+class SpatialIndex:
+    """
+    Nearest grid node search with a KD-tree on 3D unit-sphere coordinates.
+
+    The chord distance on the unit sphere gives the same nearest node as the
+    great-circle (Haversine) distance. Building the tree is O(N log N), each
+    query of M points is O(M log N) instead of M scans of the full grid.
+
+    Parameters
+    ----------
+    lat, lon : (ny, nx) array_like
+        Grid node latitudes and longitudes (degrees). Masked or NaN nodes are ignored.
+    """
+
+    def __init__(self, lat, lon):
+        lat = np.asarray(np.ma.filled(lat, np.nan), dtype=float)
+        lon = np.asarray(np.ma.filled(lon, np.nan), dtype=float)
+        if lat.shape != lon.shape:
+            raise ValueError("lat and lon must have the same shape.")
+        self.shape = lat.shape
+        xyz = _unit_sphere(lat.ravel(), lon.ravel())
+        self.nodes = np.flatnonzero(np.all(np.isfinite(xyz), axis=1))
+        self.tree = cKDTree(xyz[self.nodes])
+
+    def query(self, lat_p, lon_p):
+        """
+        Return the indices of the nearest grid node of each point.
+
+        Parameters
+        ----------
+        lat_p, lon_p : float or array_like
+            Latitudes and longitudes (degrees) of the points.
+
+        Returns
+        -------
+        tuple of ndarray
+            (j, i) indices (one array per grid dimension), with the shape of lat_p.
+        """
+        lat_p = np.asarray(lat_p, dtype=float)
+        lon_p = np.asarray(lon_p, dtype=float)
+        _, k = self.tree.query(_unit_sphere(lat_p, lon_p))
+        return np.unravel_index(self.nodes[k], self.shape)
+
+
+def spatial_index(lat, lon):
+    """
+    Return the SpatialIndex of a grid.
+
+    The index is cached for read-only arrays, such as the variables of a
+    Grid, so it is built only once per grid and process. Writable arrays may
+    change between calls, so a new index is built for them.
+
+    Parameters
+    ----------
+    lat, lon : (ny, nx) array_like
+        Grid node latitudes and longitudes (degrees).
+
+    Returns
+    -------
+    SpatialIndex
+    """
+    cacheable = (isinstance(lat, np.ndarray) and isinstance(lon, np.ndarray)
+                 and not lat.flags.writeable and not lon.flags.writeable)
+    if not cacheable:
+        return SpatialIndex(lat, lon)
+
+    key = (id(lat), id(lon))
+    hit = _INDEXES.get(key)
+    if hit is not None and hit[0]() is lat and hit[1]() is lon:
+        return hit[2]
+
+    # Forget the indexes of grids that no longer exist
+    for old_key in [k for k, v in _INDEXES.items() if v[0]() is None or v[1]() is None]:
+        del _INDEXES[old_key]
+
+    index = SpatialIndex(lat, lon)
+    _INDEXES[key] = (weakref.ref(lat), weakref.ref(lon), index)
+    return index
@@ -0,0 +1,45 @@
+import numpy as np
+
+#############################
+'''
+This module gives small helpers shared by the import and post-processing modules.
+
+List of functions:
+* _missing_not_allowed: read the ignore_missing option of the import functions
+* _float_dtype: dtype of the results, keeping floating input dtypes (e.g. float32)
+* _is_in_memory: tell plain arrays from on-disk arrays (np.memmap, netCDF variable, ...)
+* _time_chunks: read an array-like object by chunks of days
+
+It only depends on NumPy, so it can be imported without netCDF4 or scipy.
+'''
+#############################
+
+
+def _missing_not_allowed(ignore_missing):
+    return ignore_missing is False or str(ignore_missing).lower() == 'false'
+
+
+def _float_dtype(x: np.ndarray) -> np.dtype:
+    """Keep the floating dtype of x (e.g. float32), use float64 for anything else."""
+    return x.dtype if np.issubdtype(x.dtype, np.floating) else np.dtype('float64')
+
+
+def _is_in_memory(data) -> bool:
+    """True for a plain ndarray, False for on-disk arrays (np.memmap, netCDF variable, ...)."""
+    return isinstance(data, np.ndarray) and not isinstance(data, np.memmap)
+
+
+def _time_chunks(data, chunk_days: int, time_axis: int = 0):
+    """
+    Yield (i0, block) over consecutive time chunks of an array-like object.
+
+    Only `chunk_days` days are read at once. `block` is an ndarray with time
+    moved to axis 0 and masked values filled with NaN.
+    """
+    n_time = data.shape[time_axis]
+    chunk_days = max(1, int(chunk_days))
+    for i0 in range(0, n_time, chunk_days):
+        index = [slice(None)] * len(data.shape)
+        index[time_axis] = slice(i0, min(i0 + chunk_days, n_time))
+        block = np.asarray(np.ma.filled(data[tuple(index)], np.nan))
+        yield i0, np.moveaxis(block, time_axis, 0)
@@ -5,9 +5,204 @@ from datetime import datetime, timedelta
 
 import numpy as np
 from netCDF4 import Dataset 
+from scipy import sparse
+
+from GINCCO_lib.modules.grid import _as_grid, spatial_index
+from GINCCO_lib.modules.helpers import _is_in_memory
 
 #############################
 
+def _bilinear_coordinates(x_c, y_c, xq, yq, max_iter=20, tol=1e-10, eps=1e-10):
+    """
+    Solve the local cell coordinates (s, t) of many points with vectorized Newton iterations.
+
+    Parameters
+    ----------
+    x_c, y_c : (M, 4) ndarray
+        Corner coordinates of the cell of each point, in the order [c00, c10, c01, c11].
+    xq, yq : (M,) ndarray
+        Coordinates of the points.
+    max_iter, tol, eps : see section_extract
+
+    Returns
+    -------
+    s, t : (M,) ndarray
+        Local coordinates in [0, 1], NaN where the solve failed or the point is
+        outside its cell.
+    """
+    x00, x10, x01, x11 = x_c.T
+    y00, y10, y01, y11 = y_c.T
+    M = xq.size
+    s = np.full(M, 0.5)
+    t = np.full(M, 0.5)
+    ok = np.zeros(M, dtype=bool)
+    active = np.ones(M, dtype=bool)
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        a = np.flatnonzero(active)
+        sa, ta = s[a], t[a]
+
+        # Evaluate mapping
+        rx = (x00[a]*(1-sa)*(1-ta) + x10[a]*sa*(1-ta) + x01[a]*(1-sa)*ta + x11[a]*sa*ta) - xq[a]
+        ry = (y00[a]*(1-sa)*(1-ta) + y10[a]*sa*(1-ta) + y01[a]*(1-sa)*ta + y11[a]*sa*ta) - yq[a]
+        converged = np.abs(rx) + np.abs(ry) < tol
+        ok[a[converged]] = True
+
+        # Jacobian entries
+        dXds = (-(1-ta)*x00[a] + (1-ta)*x10[a] - ta*x01[a] + ta*x11[a])
+        dXdt = (-(1-sa)*x00[a] - sa*x10[a] + (1-sa)*x01[a] + sa*x11[a])
+        dYds = (-(1-ta)*y00[a] + (1-ta)*y10[a] - ta*y01[a] + ta*y11[a])
+        dYdt = (-(1-sa)*y00[a] - sa*y10[a] + (1-sa)*y01[a] + sa*y11[a])
+
+        # Solve 2x2 linear system J * [ds, dt]^T = -[rx, ry]^T
+        det = dXds*dYdt - dXdt*dYds
+        singular = np.abs(det) < eps
+        step = ~converged & ~singular
+        active[a[~step]] = False
+        a = a[step]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ds = (-rx*dYdt + dXdt*ry) / det
+            dt = (-dXds*ry + rx*dYds) / det
+
+        # Update guess, clamping helps keep iterations stable
+        s[a] = np.clip(sa[step] + ds[step], -0.5, 1.5)
+        t[a] = np.clip(ta[step] + dt[step], -0.5, 1.5)
+
+    inside = ok & (s >= -1e-6) & (s <= 1 + 1e-6) & (t >= -1e-6) & (t <= 1 + 1e-6)
+    s = np.where(inside, s, np.nan)
+    t = np.where(inside, t, np.nan)
+    return s, t
+
+
+class SectionOperator:
+    """
+    Horizontal interpolation of gridded fields onto the points of a section.
+
+    The interpolation weights of the section points are stored in a sparse
+    matrix of shape (M, ny*nx), with 4 non-zero weights per row (the corners
+    of the cell of each point). Applying the operator is one sparse
+    matrix product for any number of levels and time steps, and the operator
+    can be saved to a .npz file to reuse a transect across runs without
+    computing its geometry again.
+
+    The operator is returned by section_extract, and can also be called like
+    a function: ``operator(data3d)``.
+
+    Parameters
+    ----------
+    matrix : scipy.sparse matrix, shape (M, ny*nx)
+        Interpolation weights of each section point.
+    grid_shape : tuple of int
+        (ny, nx) shape of the grid.
+    lat, lon : (M,) array_like
+        Coordinates of the section points.
+    method : str, optional
+        Interpolation method used to build the weights ("idw" or "bilinear").
+    depth : (nz, M) array_like, optional
+        Depth section of the grid interpolated by the operator.
+
+    Examples
+    --------
+    >>> depth_sec, operator = section_extract(lat_t, lon_t, depth_t, lat_sec, lon_sec)
+    >>> operator.save('transect_A.npz')
+    >>> operator = SectionOperator.load('transect_A.npz')
+    >>> tem_sec = operator(tem_4d)          # (ntime, nz, M)
+    """
+
+    def __init__(self, matrix, grid_shape, lat, lon, method="bilinear", depth=None):
+        self.matrix = sparse.csr_matrix(matrix)
+        self.grid_shape = tuple(int(n) for n in grid_shape)
+        self.lat = np.asarray(lat, dtype=float)
+        self.lon = np.asarray(lon, dtype=float)
+        self.method = method
+        self.depth = None if depth is None else np.asarray(depth)
+        if self.matrix.shape != (self.lat.size, self.grid_shape[0] * self.grid_shape[1]):
+            raise ValueError("matrix must have shape (M, ny*nx).")
+
+    def __repr__(self):
+        return 'SectionOperator(M=%d, grid_shape=%s, method=%r)' % (self.lat.size, self.grid_shape, self.method)
+
+    def __call__(self, data):
+        return self.apply(data)
+
+    def _apply_array(self, arr):
+        """Interpolate an in-memory array of shape (..., ny, nx) to (..., M)."""
+        ny, nx = self.grid_shape
+        out_dtype = arr.dtype if np.issubdtype(arr.dtype, np.floating) else np.dtype(float)
+        flat = arr.reshape(-1, ny * nx)
+        out = self.matrix.dot(flat.T).T
+        return out.reshape(arr.shape[:-2] + (self.lat.size,)).astype(out_dtype, copy=False)
+
+    def apply(self, data):
+        """
+        Interpolate a field onto the section points.
+
+        Parameters
+        ----------
+        data : array_like, shape (..., ny, nx)
+            A 2D field, a 3D field (nz, ny, nx), a 4D stack (time, nz, ny, nx),
+            or a field on disk (np.memmap, netCDF4 variable) that is then read
+            one index of its first axis at a time.
+
+        Returns
+        -------
+        ndarray, shape (..., M)
+            Interpolated values along the section, e.g. (nz, M) for a 3D field.
+        """
+        if tuple(np.shape(data)[-2:]) != self.grid_shape:
+            raise ValueError(f"data must have shape (..., {self.grid_shape[0]}, {self.grid_shape[1]}).")
+
+        # Masked values (land, _FillValue of a netCDF variable) become NaN
+        if _is_in_memory(data) or len(data.shape) < 4:
+            return self._apply_array(np.asarray(np.ma.filled(data[...], np.nan)))
+
+        # On disk: read and interpolate one time step at a time
+        first = self._apply_array(np.asarray(np.ma.filled(data[0], np.nan)))
+        out = np.empty((data.shape[0],) + first.shape, dtype=first.dtype)
+        out[0] = first
+        for t in range(1, data.shape[0]):
+            out[t] = self._apply_array(np.asarray(np.ma.filled(data[t], np.nan)))
+        return out
+
+    def bounding_box(self):
+        """Return (slice_y, slice_x), the smallest box of grid cells used by the operator."""
+        j, i = np.unravel_index(np.unique(self.matrix.indices), self.grid_shape)
+        return slice(int(j.min()), int(j.max()) + 1), slice(int(i.min()), int(i.max()) + 1)
+
+    def crop(self, slice_y, slice_x):
+        """
+        Return the operator for fields cut to data[..., slice_y, slice_x].
+
+        With the slices of bounding_box, only the grid cells that touch the
+        section have to be read from the files.
+        """
+        ny, nx = self.grid_shape
+        keep = np.arange(ny * nx).reshape(ny, nx)[slice_y, slice_x]
+        matrix = self.matrix[:, keep.ravel()]
+        if matrix.nnz != self.matrix.nnz:
+            raise ValueError("The box does not contain all the grid cells of the section.")
+        return SectionOperator(matrix, keep.shape, self.lat, self.lon, method=self.method, depth=self.depth)
+
+    def save(self, fname):
+        """Save the operator to a .npz file, to be read with SectionOperator.load."""
+        matrix = self.matrix
+        np.savez(fname, data=matrix.data, indices=matrix.indices, indptr=matrix.indptr,
+                 shape=np.array(matrix.shape), grid_shape=np.array(self.grid_shape),
+                 lat=self.lat, lon=self.lon, method=np.array(self.method),
+                 depth=np.array([]) if self.depth is None else self.depth,
+                 has_depth=np.array(self.depth is not None))
+
+    @classmethod
+    def load(cls, fname):
+        """Read an operator saved with SectionOperator.save."""
+        with np.load(fname) as f:
+            matrix = sparse.csr_matrix((f['data'], f['indices'], f['indptr']), shape=tuple(f['shape']))
+            depth = f['depth'] if bool(f['has_depth']) else None
+            return cls(matrix, tuple(f['grid_shape']), f['lat'], f['lon'],
+                       method=str(f['method']), depth=depth)
+
+
 def section_extract(lat_array, lon_array, depth_array, lat, lon,
                     method="idw", power=2, max_iter=20, tol=1e-10, eps=1e-10):
     """
@@ -59,13 +254,16 @@ def section_extract(lat_array, lon_array, depth_array, lat, lon,
     -------
     depth_array_section : (nz, M) ndarray
         Interpolated depth_array along the section.
-    apply_to_data : callable
-        Function `apply_to_data(data3d)` that returns a data section with shape
-        (nz, M) for any scalar field `data3d` of shape (nz, ny, nx).
+    apply_to_data : SectionOperator
+        Callable `apply_to_data(data3d)` that returns a data section with shape
+        (nz, M) for any scalar field `data3d` of shape (nz, ny, nx). It also
+        accepts (time, nz, ny, nx) stacks and fields on disk, and can be saved
+        with `apply_to_data.save(fname)`.
 
     Notes
     -----
-    - Precomputes the surrounding cell and interpolation weights once.
+    - Precomputes the surrounding cell and interpolation weights once, as a
+      sparse (M, ny*nx) matrix.
     - For "bilinear", it solves for local cell coordinates (s, t) so that
       P(s, t) matches the query point inside that cell. Falls back to IDW if
       the solve fails for a point.
@@ -79,8 +277,9 @@ def section_extract(lat_array, lon_array, depth_array, lat, lon,
     # -----------------------------
     lat = np.asarray(lat).ravel()
     lon = np.asarray(lon).ravel()
-    lat_g = np.asarray(lat_array)
-    lon_g = np.asarray(lon_array)
+    # float64 coordinates, the Newton tolerance is out of reach of float32 grids
+    lat_g = np.asarray(lat_array, dtype=float)
+    lon_g = np.asarray(lon_array, dtype=float)
     depth_array = np.asarray(depth_array)
 
     if lat_g.shape != lon_g.shape:
@@ -99,224 +298,73 @@ def section_extract(lat_array, lon_array, depth_array, lat, lon,
     # 1) Utilities to locate the surrounding cell
     # -----------------------------------------
 
-    # Flatten once for a simple nearest-node search
-    lat_flat = lat_g.reshape(-1)
-    lon_flat = lon_g.reshape(-1)
-
-    def nearest_node_indices(lat_p, lon_p):
-        """Return (iy, ix) of the nearest grid node by Euclidean distance in degree space."""
-        d2 = (lat_flat - lat_p)**2 + (lon_flat - lon_p)**2
-        k = np.argmin(d2)
-        iy, ix = divmod(k, nx)
-        return iy, ix
-
+    # Nearest grid node of all the section points in one query of the
+    # KD-tree of the grid (cached for the read-only arrays of a Grid)
+    nearest_iy, nearest_ix = spatial_index(lat_array, lon_array).query(lat, lon)
 
     # -----------------------------------------
-    # 2) Prepare storage for geometry per point
+    # 2) Pick a cell around the nearest node, for all points at once
     # -----------------------------------------
     # Corner order is:
     #   c00: (iy,   ix  )  top-left
     #   c10: (iy,   ix+1)  top-right
     #   c01: (iy+1, ix  )  bottom-left
     #   c11: (iy+1, ix+1)  bottom-right
-    corner_ids = np.zeros((M, 4, 2), dtype=int)
-    # For IDW we store per-point weights for the 4 corners
-    idw_w = np.zeros((M, 4), dtype=float)
-    # For bilinear we store (s, t) inside the local cell
-    st = np.zeros((M, 2), dtype=float)
-    # Mark which points ended up using IDW even if method="bilinear"
-    fallback_idw = np.zeros(M, dtype=bool)
+    # Point at the right of (higher than) the nearest node: use [ix, ix+1] ([iy, iy+1]),
+    # else use [ix-1, ix] ([iy-1, iy]). Then clamp inside the valid range.
+    ix0 = np.where(lon > lon_g[nearest_iy, nearest_ix], nearest_ix, nearest_ix - 1)
+    iy0 = np.where(lat > lat_g[nearest_iy, nearest_ix], nearest_iy, nearest_iy - 1)
+    iy0 = np.clip(iy0, 0, ny-2)
+    ix0 = np.clip(ix0, 0, nx-2)
+
+    # (M, 4) indices of the corners of the enclosing cells
+    corner_iy = np.stack([iy0, iy0, iy0 + 1, iy0 + 1], axis=1)
+    corner_ix = np.stack([ix0, ix0 + 1, ix0, ix0 + 1], axis=1)
+    corner_flat = corner_iy * nx + corner_ix
+
+    # Corner coordinates and distances to the corners (used for IDW and for exact-hit shortcut)
+    y_c = lat_g[corner_iy, corner_ix]
+    x_c = lon_g[corner_iy, corner_ix]
+    dist = np.hypot(y_c - lat[:, None], x_c - lon[:, None])
 
     # -----------------------------------------
-    # 3) Build per-point local geometry
-    #    a) pick a cell around the nearest node
-    #    b) compute either IDW weights or solve bilinear (s, t)
+    # 3) Interpolation weights of the 4 corners, shape (M, 4)
     # -----------------------------------------
-    for m in range(M):
-        # 3a) Find a valid cell around the query point
-        # note the problem about the cell story here. 
-        iy, ix = nearest_node_indices(lat[m], lon[m])
-
-
-
-        # Suppose nearest node is (iy0, ix0)
-        if lon[m] > lon_g[iy, ix]:
-            #Point at the right of nearest point
-            ix0 = ix               # use [ix0, ix0+1]
-        else:
-            #Point at the left of nearest point
-            ix0 = ix - 1           # use [ix0-1, ix0]
-
-        if lat[m] > lat_g[iy, ix]:
-            #Point higher than the nearest point
-            iy0 = iy   # use [iy0, iy0+1]
-        else:
-            #Point lower than the nearest point
-            iy0 = iy - 1           # use [iy0-1, iy0]
-
-        # Clamp inside valid range
-        iy0 = np.clip(iy0, 0, ny-2)
-        ix0 = np.clip(ix0, 0, nx-2)
-
-        # Corners of the enclosing cell
-        corners = np.array([
-            [iy0,     ix0    ],  # c00
-            [iy0,     ix0 + 1],  # c10
-            [iy0 + 1, ix0    ],  # c01
-            [iy0 + 1, ix0 + 1]   # c11
-        ], dtype=int)
-        corner_ids[m] = corners
-
-        # Extract corner coordinates
-        y00, x00 = lat_g[iy0,     ix0],     lon_g[iy0,     ix0]
-        y10, x10 = lat_g[iy0,     ix0 + 1], lon_g[iy0,     ix0 + 1]
-        y01, x01 = lat_g[iy0 + 1, ix0],     lon_g[iy0 + 1, ix0]
-        y11, x11 = lat_g[iy0 + 1, ix0 + 1], lon_g[iy0 + 1, ix0 + 1]
-
-        # Distances to corners (used for IDW and for exact-hit shortcut)
-        dy = np.array([y00, y10, y01, y11]) - lat[m]
-        dx = np.array([x00, x10, x01, x11]) - lon[m]
-        dist = np.hypot(dy, dx)
-
-        # If the query hits a node exactly, make it a pure pick
-        if np.any(dist < eps):
-            w = np.zeros(4, dtype=float)
-            w[np.argmin(dist)] = 1.0
-            idw_w[m] = w
-            st[m] = 0.0  # not used
-            fallback_idw[m] = True if method == "bilinear" else False
-            continue
-
-        if method == "idw":
-            # 3b-IDW) Inverse-distance weights on the 4 corners
-            w = 1.0 / (dist**power)
-            w /= w.sum()
-            idw_w[m] = w
-
-        else:
-            # 3b-Bilinear) Solve for (s, t) in the bilinear mapping
-            # Position function:
-            #   X(s,t) = x00*(1-s)*(1-t) + x10*s*(1-t) + x01*(1-s)*t + x11*s*t
-            #   Y(s,t) = y00*(1-s)*(1-t) + y10*s*(1-t) + y01*(1-s)*t + y11*s*t
-            # Solve F(s,t) = [X(s,t)-xq, Y(s,t)-yq] = 0 by Newton iterations
-            xq, yq = lon[m], lat[m]
-            s = 0.5
-            t = 0.5
-            ok = False
-            for _ in range(max_iter):
-                # Evaluate mapping
-                X = (x00*(1-s)*(1-t) + x10*s*(1-t) + x01*(1-s)*t + x11*s*t)
-                Y = (y00*(1-s)*(1-t) + y10*s*(1-t) + y01*(1-s)*t + y11*s*t)
-                rx = X - xq
-                ry = Y - yq
-                if abs(rx) + abs(ry) < tol:
-                    ok = True
-                    break
-
-                # Jacobian entries
-                dXds = (-(1-t)*x00 + (1-t)*x10 - t*x01 + t*x11)
-                dXdt = (-(1-s)*x00 - s*x10 + (1-s)*x01 + s*x11)
-                dYds = (-(1-t)*y00 + (1-t)*y10 - t*y01 + t*y11)
-                dYdt = (-(1-s)*y00 - s*y10 + (1-s)*y01 + s*y11)
-
-                # Solve 2x2 linear system J * [ds, dt]^T = -[rx, ry]^T
-                det = dXds*dYdt - dXdt*dYds
-                if abs(det) < eps:
-                    ok = False
-                    break
-                ds = (-rx*dYdt + dXdt*ry) / det
-                dt = (-dXds*ry + rx*dYds) / det
-
-                # Update guess
-                s += ds
-                t += dt
-
-                # Optional clamping helps keep iterations stable
-                s = float(np.clip(s, -0.5, 1.5))
-                t = float(np.clip(t, -0.5, 1.5))
-
-            if ok and (0.0 - 1e-6 <= s <= 1.0 + 1e-6) and (0.0 - 1e-6 <= t <= 1.0 + 1e-6):
-                # Store solved (s, t)
-                st[m, 0] = s
-                st[m, 1] = t
-            else:
-                # Fall back to IDW if the solve failed
-                w = 1.0 / (dist**power)
-                w /= w.sum()
-                idw_w[m] = w
-                fallback_idw[m] = True
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weights = 1.0 / (dist**power)
+        weights /= weights.sum(axis=1, keepdims=True)
+
+    if method == "bilinear":
+        # Solve for (s, t) in the bilinear mapping, for all points at once
+        # Position function:
+        #   X(s,t) = x00*(1-s)*(1-t) + x10*s*(1-t) + x01*(1-s)*t + x11*s*t
+        #   Y(s,t) = y00*(1-s)*(1-t) + y10*s*(1-t) + y01*(1-s)*t + y11*s*t
+        # Solve F(s,t) = [X(s,t)-xq, Y(s,t)-yq] = 0 by Newton iterations.
+        # Points that failed (singular Jacobian, no convergence or outside
+        # the cell) fall back to IDW.
+        s, t = _bilinear_coordinates(x_c, y_c, lon, lat, max_iter, tol, eps)
+        use_bilinear = np.isfinite(s)
+        s, t = s[use_bilinear, None], t[use_bilinear, None]
+        weights[use_bilinear] = np.concatenate([(1 - s) * (1 - t), s * (1 - t),
+                                                (1 - s) * t, s * t], axis=1)
+
+    # If the query hits a node exactly, make it a pure pick
+    hit = np.any(dist < eps, axis=1)
+    weights[hit] = 0.0
+    weights[hit, np.argmin(dist[hit], axis=1)] = 1.0
 
     # -----------------------------------------
-    # 4) Helper to combine corner values into a single interpolated value
+    # 4) Sparse operator of the (M, 4) weights, shape (M, ny*nx)
     # -----------------------------------------
-    def combine_layer(values4, m):
-        """
-        Combine 4 corner values for point m into one value according to method.
-
-        values4 order: [c00, c10, c01, c11]
-        """
-        if method == "bilinear" and not fallback_idw[m]:
-            s, t = st[m]
-            # Bilinear weights
-            w00 = (1 - s) * (1 - t)
-            w10 = s * (1 - t)
-            w01 = (1 - s) * t
-            w11 = s * t
-            return w00*values4[0] + w10*values4[1] + w01*values4[2] + w11*values4[3]
-        else:
-            # IDW path
-            w = idw_w[m]
-            return w[0]*values4[0] + w[1]*values4[1] + w[2]*values4[2] + w[3]*values4[3]
+    rows = np.repeat(np.arange(M), 4)
+    matrix = sparse.csr_matrix((weights.ravel(), (rows, corner_flat.ravel())), shape=(M, ny * nx))
+    apply_to_data = SectionOperator(matrix, (ny, nx), lat, lon, method=method)
 
     # -----------------------------------------
     # 5) Interpolate the depth_array section using precomputed geometry
     # -----------------------------------------
-    depth_section = np.empty((nz, M), dtype=depth_array.dtype)
-    for k in range(nz):
-        # Gather corner values for all points
-        c00 = depth_array[k, corner_ids[:, 0, 0], corner_ids[:, 0, 1]]
-        c10 = depth_array[k, corner_ids[:, 1, 0], corner_ids[:, 1, 1]]
-        c01 = depth_array[k, corner_ids[:, 2, 0], corner_ids[:, 2, 1]]
-        c11 = depth_array[k, corner_ids[:, 3, 0], corner_ids[:, 3, 1]]
-
-        # Combine per point
-        for m in range(M):
-            depth_section[k, m] = combine_layer(
-                np.array([c00[m], c10[m], c01[m], c11[m]]), m
-            )
-
-    # -----------------------------------------
-    # 6) Return a callable for any scalar 3-D field
-    # -----------------------------------------
-    def apply_to_data(data3d):
-        """
-        Interpolate a scalar field on the same grid onto the pre-defined section.
-
-        Parameters
-        ----------
-        data3d : (nz, ny, nx) array_like
-            Scalar field (e.g., temperature, salinity).
-
-        Returns
-        -------
-        data_section : (nz, M) ndarray
-            Interpolated values along the section.
-        """
-        arr = np.asarray(data3d)
-        if arr.shape != (nz, ny, nx):
-            raise ValueError(f"data3d must have shape {(nz, ny, nx)}.")
-
-        out = np.empty((nz, M), dtype=arr.dtype)
-        for k in range(nz):
-            c00 = arr[k, corner_ids[:, 0, 0], corner_ids[:, 0, 1]]
-            c10 = arr[k, corner_ids[:, 1, 0], corner_ids[:, 1, 1]]
-            c01 = arr[k, corner_ids[:, 2, 0], corner_ids[:, 2, 1]]
-            c11 = arr[k, corner_ids[:, 3, 0], corner_ids[:, 3, 1]]
-            for m in range(M):
-                out[k, m] = combine_layer(
-                    np.array([c00[m], c10[m], c01[m], c11[m]]), m
-                )
-        return out
+    depth_section = apply_to_data(depth_array)
+    apply_to_data.depth = depth_section
 
     return depth_section, apply_to_data
 
@@ -328,31 +376,34 @@ def _data_interp(depth_sec, data_sec, depth_interval=1.0):
     """
     Interpolate irregular-depth section data (nz, M) onto one shared regular depth grid.
 
+    All columns (and all time steps) are interpolated at once, in one batched
+    searchsorted and linear interpolation over the valid points of every column.
+
     Assumptions
     -----------
-    - Each column in depth_sec is ordered (shallow to deep).
+    - Each column in depth_sec is ordered by increasing depth value (from the bottom to the surface).
     - No extrapolation: values outside a column's native range are NaN.
 
     Parameters
     ----------
     depth_sec : ndarray, shape (nz, M)
         Irregular depths for each column.
-    data_sec : ndarray, shape (nz, M)
-        Data at the given depths.
+    data_sec : ndarray, shape (nz, M) or (ntime, nz, M)
+        Data at the given depths, with an optional leading time axis.
     depth_interval : float, optional
         Spacing for the target depth grid.
 
     Returns
     -------
-    new_depth : ndarray, shape (K, M)
-        Shared regular depth grid replicated across columns.
-    data_out : ndarray, shape (K, M)
+    new_depth : ndarray, shape (K,)
+        Shared regular depth grid of all columns.
+    data_out : ndarray, shape (K, M) or (ntime, K, M)
         Interpolated data on new_depth.
     """
     depth_sec = np.asarray(depth_sec, dtype=float)
     data_sec  = np.asarray(data_sec,  dtype=float)
-    if depth_sec.shape != data_sec.shape:
-        raise ValueError("depth_sec and data_sec must have the same shape (nz, M).")
+    if depth_sec.ndim != 2 or data_sec.shape[-2:] != depth_sec.shape:
+        raise ValueError("data_sec must have shape (nz, M) or (ntime, nz, M) matching depth_sec (nz, M).")
 
     # Global min and max across the entire array
     global_min = np.nanmin(depth_sec)
@@ -362,29 +413,75 @@ def _data_interp(depth_sec, data_sec, depth_interval=1.0):
 
     # Build shared target grid
     z1d = np.arange(global_min, global_max + 1e-12, float(depth_interval))
-    K, M = z1d.size, depth_sec.shape[1]
+    K = z1d.size
+    nz, M = depth_sec.shape
+    lead = data_sec.shape[:-2]
+
+    # Columns along the last axis: depth (M, nz), data (ntime, M, nz)
+    d = depth_sec.T
+    v = np.swapaxes(data_sec, -1, -2).reshape((-1, M, nz))
+    valid = np.isfinite(d) & np.isfinite(v)
+
+    # Batched interpolation: each (time, column) series is shifted by its own
+    # offset, so that the valid points of all the series form one increasing
+    # array, and all the targets are interpolated in a single np.interp call
+    # (searchsorted plus linear weights). Targets are never interpolated
+    # between two series, since they are inside their own series' range.
+    span = (global_max - global_min) + 2.0
+    offset = np.arange(v.shape[0] * M, dtype=float).reshape(v.shape[:2] + (1,)) * span
+    keys = ((d - global_min) + offset)[valid]
+    targets = (z1d - global_min) + offset
+    if keys.size:
+        data_out = np.interp(targets, keys, v[valid])
+    else:
+        data_out = np.full(targets.shape, np.nan)
 
-    # Interpolate each column without extrapolation
-    data_out = np.full((K, M), np.nan, dtype=float)
-    for m in range(M):
-        d = depth_sec[:, m]
-        v = data_sec[:, m]
-        mask = np.isfinite(d) & np.isfinite(v)
-        d = d[mask]
-        v = v[mask]
-        if d.size < 2:
-            continue
-        col = np.interp(z1d, d, v)
-        col[(z1d < d[0]) | (z1d > d[-1])] = np.nan
-        data_out[:, m] = col
+    # No extrapolation, and at least two valid points per column
+    first_depth = np.where(valid, d, np.inf).min(axis=-1)[..., None]
+    last_depth = np.where(valid, d, -np.inf).max(axis=-1)[..., None]
+    inside = (valid.sum(axis=-1)[..., None] >= 2) & (z1d >= first_depth) & (z1d <= last_depth)
+    data_out[~inside] = np.nan
+    data_out = data_out.reshape(lead + (M, K))
 
-    # Depth grid replicated to (K, M)
-    new_depth = np.tile(z1d[:, None], (1, M))
-    return new_depth, data_out
+    data_out = np.swapaxes(data_out, -1, -2)
+    return z1d, data_out
 
 
 
-def import_section(path, file_name, var, lon_min, lon_max, lat_min, lat_max, M, depth_interval):
+def _section_line(lon_min, lon_max, lat_min, lat_max, M):
+    """Return the (lat, lon) coordinates of M points from A to B. A constant lon (or lat) gives a line along longitude (or latitude)."""
+    if lon_min == lon_max:
+        if lat_min == lat_max:
+            raise ValueError('lon_min = lon_max and lat_min = lat_max. Not a section.')
+        lon_sec = np.full(M, lon_max)
+        lat_sec = np.linspace(lat_min, lat_max, M)
+    elif lat_min == lat_max:
+        lat_sec = np.full(M, lat_max)
+        lon_sec = np.linspace(lon_min, lon_max, M)
+    else:
+        lat_sec = np.linspace(lat_min, lat_max, M)      # lat section
+        lon_sec = np.linspace(lon_min, lon_max, M)      # lon_section
+    return lat_sec, lon_sec
+
+
+def _section_operator(path, var, lon_min, lon_max, lat_min, lat_max, M, grid=None, operator=None):
+    """Return the bilinear SectionOperator of the section A-B on the grid of var, or load/return the given operator."""
+    if operator is None:
+        # Read the grid (loaded once per process) to determine depth dimensions
+        grid = _as_grid(grid, path)
+        lat_t = grid.variable('latitude', var)
+        lon_t = grid.variable('longitude', var)
+        depth_t = grid.variable('depth', var)
+
+        # Setup the section
+        lat_sec, lon_sec = _section_line(lon_min, lon_max, lat_min, lat_max, M)
+        operator = section_extract(lat_t, lon_t, depth_t, lat_sec, lon_sec, method="bilinear")[1]
+    elif not isinstance(operator, SectionOperator):
+        operator = SectionOperator.load(operator)
+    return operator
+
+
+def import_section(path, file_name, var, lon_min, lon_max, lat_min, lat_max, M, depth_interval, grid=None, operator=None):
     """
     Import a vertical section from a file. Supports all kinds of sections: along latitude, longitude, or diagonal line.
     This function serves as the main controller.
@@ -403,56 +500,41 @@ def import_section(path, file_name, var, lon_min, lon_max, lat_min, lat_max, M,
         Number of points in the section following its direction from A to B.
     depth_interval : float
         Interval of Z.
+    grid : Grid or str, optional
+        Grid of the run, from open_grid(path). Default None uses the grid.nc
+        in `path`, read once per process.
+    operator : SectionOperator or str, optional
+        Section operator (or the .npz file written by SectionOperator.save)
+        from a previous call of section_extract. It skips the computation of
+        the section geometry; lon_min, lon_max, lat_min, lat_max and M are
+        then ignored.
 
     Returns
     -------
     new_depth : ndarray of shape (K, M)
-        Shared regular depth grid replicated across columns.
+        Shared regular depth grid replicated across columns. It is kept 2D
+        for the existing callers (e.g. plot_section), as a read-only view of
+        the 1D depth grid instead of a copy.
     data_out : ndarray of shape (K, M)
         Interpolated data on new_depth.
 
     """
 
 
-    # Open the grid file to determine depth dimensions
-    grid = os.path.join(path, 'grid.nc')
-    with Dataset(grid, 'r') as fgrid:
-        try:
-            lat_t = fgrid.variables['latitude_%s' % (var[-1])][:]
-            lon_t = fgrid.variables['longitude_%s' % (var[-1])][:]
-            depth_t = fgrid.variables['depth_%s' % (var[-1])][:]
-        except KeyError:
-            print('Could not find a grid suffix for %s. Using _t as default.' % (var))
-            lat_t = fgrid.variables['latitude_t'][:]
-            lon_t = fgrid.variables['longitude_t'][:]
-            depth_t = fgrid.variables['depth_t'][:]
-    
+    operator = _section_operator(path, var, lon_min, lon_max, lat_min, lat_max, M, grid, operator)
+    depth_sec = operator.depth
+
     with Dataset(os.path.join(path, file_name), 'r') as nc_file:
         data = np.squeeze(nc_file.variables[var][:])
 
-
-    # Setup the section
-    if (lon_min == lon_max):
-        if lat_min == lat_max:  
-            raise ValueError('lon_min = lon_max and lat_min = lat_max. Not a section.')
-        else:
-            lon_sec = np.full(M, lon_max)
-            lat_sec = np.linspace(lat_min, lat_max, M) 
-    elif lat_min == lat_max:
-            lat_sec = np.full(M, lat_max)
-            lon_sec = np.linspace(lon_min, lon_max, M) 
-    else:
-        lat_sec = np.linspace(lat_min, lat_max, M)      # lat section
-        lon_sec = np.linspace(lon_min, lon_max, M)      # lon_section
-
-    depth_sec, apply_interp = section_extract(lat_t, lon_t, depth_t, lat_sec, lon_sec, method="bilinear")
-
     #interpolate data
-    data_interpolation = apply_interp(data) # shape: (nz, M)
+    data_interpolation = operator(data) # shape: (nz, M)
 
     #interpolate depth and data into 1m for better representation
-    depth_out, data_out = _data_interp(depth_sec, data_interpolation, depth_interval=depth_interval)
+    z1d, data_out = _data_interp(depth_sec, data_interpolation, depth_interval=depth_interval)
 
+    # Depth grid replicated to (K, M) as a view, without copy
+    depth_out = np.broadcast_to(z1d[:, None], data_out.shape)
     return depth_out, data_out
 
 
@@ -1,10 +1,16 @@
 import os
 import glob
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 
 import numpy as np
 from netCDF4 import Dataset 
 
+from GINCCO_lib.modules.grid import _as_grid, spatial_index
+from GINCCO_lib.modules.helpers import _missing_not_allowed
+from GINCCO_lib.modules.vertical_interpolation import depth_weights, apply_depth_weights
+from GINCCO_lib.modules.import_daily import _section_operator, _data_interp
+
 #############################
 '''
 This module usse to import files.
@@ -16,21 +22,23 @@ List of functions:
 * import_layer: import a layer of 3D file in time series (3D in output)
 * import_surface: import the surface layer of 3D file in time series (3D in output)
 * import_depth: import data at the specified depth from an 3D file in time series (3D in output)
+* import_many: import several variables in one sweep over the files (dict of arrays in output)
+* iter_days: read the files one day at a time, as a generator of (date, array)
+* import_section_series: import a vertical section in time series (3D in output: time, depth, point)
 
 
 Features: 
 * Automatically load the correct grid indice (_u, _v, _w, ...)
+* The grid file is read once per process and shared (see GINCCO_lib.modules.grid), or can be given with grid=
 * For multiple file, it will check if all the file is available or not, before really load the file to avoid crash in the middle. 
 * You can choose to stop the script if any file is missing, or fill the data on that date with nan value
+* Files can be read and decoded in parallel with workers=N (N worker processes)
+* import_4D can write into an on-disk array (out='file.npy' or out='file.nc') for records larger than memory
 
 '''
 #############################
 
 
-def _missing_not_allowed(ignore_missing):
-    return ignore_missing is False or str(ignore_missing).lower() == 'false'
-
-
 def _raise_if_missing(file_list):
     if "" in file_list:
         raise FileNotFoundError(
@@ -38,6 +46,98 @@ def _raise_if_missing(file_list):
         )
 
 
+def _read_field(fpath, var, index):
+    """Read var[index] from one file, with masked values filled by NaN."""
+    with Dataset(fpath, 'r') as file1:
+        return np.ma.filled(np.squeeze(file1.variables[var][index]), np.nan)
+
+
+def _read_levels(fpath, var, k_start, k_end):
+    """Read the levels k_start..k_end and the bottom level of a 3D variable from one file."""
+    with Dataset(fpath, 'r') as file1:
+        nc_var = file1.variables[var]
+        levels = np.ma.filled(nc_var[0, k_start:k_end + 1, :, :], np.nan)
+        bottom = levels[0] if k_start == 0 else np.ma.filled(nc_var[0, 0, :, :], np.nan)
+    return levels, bottom
+
+
+def _read_fields(fpath, variables):
+    """Read several full variables from one file, opening it only once."""
+    with Dataset(fpath, 'r') as file1:
+        return [np.ma.filled(np.squeeze(file1.variables[var][:]), np.nan) for var in variables]
+
+
+def _read_files(file_list, reader, args, workers=None):
+    """
+    Read every file of file_list with reader(fpath, *args).
+
+    Yields (i, fpath, data) in day order. Missing files ("") give data=None.
+    If workers > 1, files are read and decoded concurrently in a pool of
+    worker processes (netCDF is not thread safe), but the results are still
+    yielded in day order so the caller can write each day into its slot.
+    At most 2 * workers reads are in flight, so finished days do not pile up
+    in memory while the caller consumes them.
+    """
+    if workers is None or int(workers) <= 1:
+        for i, fpath in enumerate(file_list):
+            yield i, fpath, (reader(fpath, *args) if fpath else None)
+        return
+
+    workers = int(workers)
+    present = iter([i for i, fpath in enumerate(file_list) if fpath])
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+
+        def _submit_next():
+            i = next(present, None)
+            if i is not None:
+                futures[i] = pool.submit(reader, file_list[i], *args)
+
+        for _ in range(2 * workers):
+            _submit_next()
+        for i, fpath in enumerate(file_list):
+            if not fpath:
+                yield i, fpath, None
+                continue
+            data = futures.pop(i).result()
+            # One read done: start the next one before handing this day over
+            _submit_next()
+            yield i, fpath, data
+
+
+
+def _create_store(out, var, shape, dtype):
+    """
+    Create the on-disk array filled day by day by import_4D when out= is given.
+
+    A path ending with '.nc' gives a NetCDF file chunked by day, any other path
+    a .npy file opened as np.memmap.
+    """
+    if str(out).endswith('.nc'):
+        nc_out = Dataset(out, 'w')
+        dims = ('time', 'z', 'y', 'x')
+        for name, size in zip(dims, shape):
+            nc_out.createDimension(name, size)
+        store = nc_out.createVariable(var, np.dtype(dtype), dims, chunksizes=(1,) + tuple(shape[1:]))
+        store.set_auto_mask(False)
+        return store
+    return np.lib.format.open_memmap(out, mode='w+', dtype=dtype, shape=shape)
+
+
+def _finish_store(store, out, var):
+    """Flush the on-disk array and reopen it read-only as a lazily indexed array."""
+    if isinstance(store, np.memmap):
+        store.flush()
+        del store
+        return np.load(out, mmap_mode='r')
+
+    store.group().close()
+    nc_in = Dataset(out, 'r')
+    store = nc_in.variables[var]
+    store.set_auto_mask(False)
+    return store
+
+
 
 
 def build_file_list(path, tstart, tend):
@@ -106,7 +206,7 @@ def build_file_list(path, tstart, tend):
 
 
 
-def import_4D(path, var, tstart, tend, ignore_missing='False'):
+def import_4D(path, var, tstart, tend, ignore_missing='False', workers=None, dtype='float64', out=None, grid=None):
     """
     Import a 4D variable from a sequence of daily NetCDF files.
 
@@ -123,12 +223,30 @@ def import_4D(path, var, tstart, tend, ignore_missing='False'):
     ignore_missing : str, optional
         If 'False' (default), the function exits when a file is missing.
         If 'True', missing days are allowed and filled with NaN.
+    workers : int, optional
+        Number of worker processes used to read and decode the files
+        concurrently. Default None reads the files one by one.
+        Worker processes are started with 'spawn' on Windows and macOS, which
+        imports the calling script again: a script with workers > 1 must then
+        run its code under ``if __name__ == '__main__':``.
+    grid : Grid or str, optional
+        Grid of the run, from open_grid(path). Default None uses the grid.nc
+        in `path`, read once per process.
+    dtype : str or numpy.dtype, optional
+        Data type of the output array. Default 'float64'. Use 'float32' to
+        halve the memory, data are then filled directly in float32.
+    out : str, optional
+        Write the result into a file instead of memory, for records that do
+        not fit in RAM. A path ending with '.nc' gives a NetCDF file chunked by
+        day, any other path a .npy file used as np.memmap. Default None.
 
     Returns
     -------
-    numpy.ndarray
-        A 4D array with shape (ntime, nz, ny, nx), dtype float64.
+    numpy.ndarray, numpy.memmap or netCDF4.Variable
+        A 4D array with shape (ntime, nz, ny, nx), dtype given by `dtype` (float64 by default).
         Missing files are represented with NaN values.
+        With out=..., a read-only array-like object reading the file lazily.
+        monthly_mean, annual_mean and spatial_average process it chunk by chunk.
     """
 
     duration = tend - tstart
@@ -141,25 +259,22 @@ def import_4D(path, var, tstart, tend, ignore_missing='False'):
     if _missing_not_allowed(ignore_missing):
         _raise_if_missing(file_list)
 
-    # Open the grid file to determine depth dimensions
-    grid = os.path.join(path, 'grid.nc')
-    with Dataset(grid, 'r') as fgrid:
-        try:
-            depth_t = fgrid.variables['depth_%s' % (var[-1])][:]
-        except KeyError:
-            print('Could not find a grid suffix for %s. Using _t as default.' % (var))
-            depth_t = fgrid.variables['depth_t'][:]
+    # Read the grid (loaded once per process) to determine depth dimensions
+    grid = _as_grid(grid, path)
+    depth_t = grid.variable('depth', var)
 
     # Prepare output array filled with zeros
     # Shape: [time, depth_z, depth_y, depth_x]
     print('Processing path: %s at %s' % (path, datetime.now()))
-    data_array = np.zeros(
-        (duration.days + 1, np.size(depth_t, 0), np.size(depth_t, 1), np.size(depth_t, 2)),
-        dtype='float64'
-    )
+    shape = (duration.days + 1, np.size(depth_t, 0), np.size(depth_t, 1), np.size(depth_t, 2))
+    if out is None:
+        data_array = np.zeros(shape, dtype=dtype)
+    else:
+        data_array = _create_store(out, var, shape, dtype)
 
     # Loop through all files in the list
-    for i, fpath in enumerate(file_list):
+    index = np.s_[:, :, :, :]
+    for i, fpath, data in _read_files(file_list, _read_field, (var, index), workers):
         tnow = tstart + timedelta(days=i)
 
         # Print the filename on the first day of each month (if available)
@@ -167,17 +282,17 @@ def import_4D(path, var, tstart, tend, ignore_missing='False'):
             if fpath:
                 print(fpath)
 
-        # If the file exists, read the variable into the output array
+        # If the file exists, write the variable into the output array
         if fpath:
-            with Dataset(fpath, 'r') as file1:
-                data_array[i, :, :, :] = np.ma.filled(
-                    np.squeeze(file1.variables[var][:, :, :, :]), np.nan
-                )
+            data_array[i, :, :, :] = data
         # If the file is missing, fill with NaN values
         if not fpath:
             print(('File not found for:', str(tnow)), 'Missing values will be filled with NaN')
             data_array[i, :, :, :] = np.nan
 
+    if out is not None:
+        data_array = _finish_store(data_array, out, var)
+
     print('Import completed.')
     return data_array
 
@@ -186,7 +301,7 @@ def import_4D(path, var, tstart, tend, ignore_missing='False'):
 
 
 
-def import_3D(path, var, tstart, tend, ignore_missing='False'):
+def import_3D(path, var, tstart, tend, ignore_missing='False', workers=None, dtype='float64', grid=None):
     """
     Import a 3D variable from a sequence of daily NetCDF files.
 
@@ -203,11 +318,23 @@ def import_3D(path, var, tstart, tend, ignore_missing='False'):
     ignore_missing : str, optional
         If 'False' (default), the function exits when a file is missing.
         If 'True', missing days are allowed and filled with NaN.
+    workers : int, optional
+        Number of worker processes used to read and decode the files
+        concurrently. Default None reads the files one by one.
+        Worker processes are started with 'spawn' on Windows and macOS, which
+        imports the calling script again: a script with workers > 1 must then
+        run its code under ``if __name__ == '__main__':``.
+    grid : Grid or str, optional
+        Grid of the run, from open_grid(path). Default None uses the grid.nc
+        in `path`, read once per process.
+    dtype : str or numpy.dtype, optional
+        Data type of the output array. Default 'float64'. Use 'float32' to
+        halve the memory, data are then filled directly in float32.
 
     Returns
     -------
     numpy.ndarray
-        A 3D surface array with shape (ntime, ny, nx), dtype float64.
+        A 3D surface array with shape (ntime, ny, nx), dtype given by `dtype` (float64 by default).
         Missing files are represented with NaN values.
     """
 
@@ -221,25 +348,21 @@ def import_3D(path, var, tstart, tend, ignore_missing='False'):
     if _missing_not_allowed(ignore_missing):
         _raise_if_missing(file_list)
 
-    # Open the grid file to determine depth dimensions
-    grid = os.path.join(path, 'grid.nc')
-    with Dataset(grid, 'r') as fgrid:
-        try:
-            depth_t = fgrid.variables['depth_%s' % (var[-1])][:]
-        except KeyError:
-            print('Could not find a grid suffix for %s. Using _t as default.' % (var))
-            depth_t = fgrid.variables['depth_t'][:]
+    # Read the grid (loaded once per process) to determine depth dimensions
+    grid = _as_grid(grid, path)
+    depth_t = grid.variable('depth', var)
 
     # Prepare output array filled with zeros
     # Shape: [time, depth_y, depth_x]
     print('Processing path: %s at %s' % (path, datetime.now()))
     data_array = np.zeros(
         (duration.days + 1, np.size(depth_t, 1), np.size(depth_t, 2)),
-        dtype='float64'
+        dtype=dtype
     )
 
     # Loop through all files in the list
-    for i, fpath in enumerate(file_list):
+    index = np.s_[:, :, :]
+    for i, fpath, data in _read_files(file_list, _read_field, (var, index), workers):
         tnow = tstart + timedelta(days=i)
 
         # Print the filename on the first day of each month (if available)
@@ -247,14 +370,9 @@ def import_3D(path, var, tstart, tend, ignore_missing='False'):
             if fpath:
                 print(fpath)
 
-        # If the file exists, read the variable into the output array
+        # If the file exists, write the variable into the output array
         if fpath:
-            with Dataset(fpath, 'r') as file1:
-                data_array[i, :, :] = np.ma.filled(
-                    np.squeeze(file1.variables[var][ :, :, :]), np.nan
-                )
-            
-
+            data_array[i, :, :] = data
 
         # If the file is missing, fill with NaN values
         if not fpath:
@@ -268,7 +386,7 @@ def import_3D(path, var, tstart, tend, ignore_missing='False'):
 #############################
 
 
-def import_surface(path, var, tstart, tend, ignore_missing='False'):
+def import_surface(path, var, tstart, tend, ignore_missing='False', workers=None, dtype='float64', grid=None):
     """
     Import a surface variable from a sequence of daily NetCDF files.
 
@@ -285,11 +403,23 @@ def import_surface(path, var, tstart, tend, ignore_missing='False'):
     ignore_missing : str, optional
         If 'False' (default), the function exits when a file is missing.
         If 'True', missing days are allowed and filled with NaN.
+    workers : int, optional
+        Number of worker processes used to read and decode the files
+        concurrently. Default None reads the files one by one.
+        Worker processes are started with 'spawn' on Windows and macOS, which
+        imports the calling script again: a script with workers > 1 must then
+        run its code under ``if __name__ == '__main__':``.
+    grid : Grid or str, optional
+        Grid of the run, from open_grid(path). Default None uses the grid.nc
+        in `path`, read once per process.
+    dtype : str or numpy.dtype, optional
+        Data type of the output array. Default 'float64'. Use 'float32' to
+        halve the memory, data are then filled directly in float32.
 
     Returns
     -------
     numpy.ndarray
-        A 3D array with shape (ntime, ny, nx), dtype float64.
+        A 3D array with shape (ntime, ny, nx), dtype given by `dtype` (float64 by default).
         Missing files are represented with NaN values.
     """
 
@@ -303,22 +433,18 @@ def import_surface(path, var, tstart, tend, ignore_missing='False'):
     if _missing_not_allowed(ignore_missing):
         _raise_if_missing(file_list)
 
-    # Open the grid file to determine depth dimensions
-    grid = os.path.join(path, 'grid.nc')
-    with Dataset(grid, 'r') as fgrid:
-        try:
-            depth_t = fgrid.variables['depth_%s' % (var[-1])][:]
-        except KeyError:
-            print('Could not find a grid suffix for %s. Using _t as default.' % (var))
-            depth_t = fgrid.variables['depth_t'][:]
+    # Read the grid (loaded once per process) to determine depth dimensions
+    grid = _as_grid(grid, path)
+    depth_t = grid.variable('depth', var)
 
     # Prepare output array filled with zeros
     # Shape: [time, depth_z, depth_y, depth_x]
     print('Processing path: %s at %s' % (path, datetime.now()))
-    data_array = np.zeros((duration.days + 1, np.size(depth_t, 1), np.size(depth_t, 2)), dtype='float64')
+    data_array = np.zeros((duration.days + 1, np.size(depth_t, 1), np.size(depth_t, 2)), dtype=dtype)
 
     # Loop through all files in the list
-    for i, fpath in enumerate(file_list):
+    index = np.s_[:, -1, :, :]
+    for i, fpath, data in _read_files(file_list, _read_field, (var, index), workers):
         tnow = tstart + timedelta(days=i)
 
         # Print the filename on the first day of each month (if available)
@@ -326,12 +452,9 @@ def import_surface(path, var, tstart, tend, ignore_missing='False'):
             if fpath:
                 print(fpath)
 
-        # If the file exists, read the variable into the output array
+        # If the file exists, write the variable into the output array
         if fpath:
-            with Dataset(fpath, 'r') as file1:
-                data_array[i, :, :] = np.ma.filled(
-                    np.squeeze(file1.variables[var][:, -1, :, :]), np.nan
-                )
+            data_array[i, :, :] = data
 
         # If the file is missing, fill with NaN values
         if not fpath:
@@ -346,7 +469,7 @@ def import_surface(path, var, tstart, tend, ignore_missing='False'):
 
 
 
-def import_layer(path, var, tstart, tend, layer, ignore_missing='False'):
+def import_layer(path, var, tstart, tend, layer, ignore_missing='False', workers=None, dtype='float64', grid=None):
     """
     Import a surface variable from a sequence of daily NetCDF files.
 
@@ -365,11 +488,23 @@ def import_layer(path, var, tstart, tend, layer, ignore_missing='False'):
     ignore_missing : str, optional
         If 'False' (default), the function exits when a file is missing.
         If 'True', missing days are allowed and filled with NaN.
+    workers : int, optional
+        Number of worker processes used to read and decode the files
+        concurrently. Default None reads the files one by one.
+        Worker processes are started with 'spawn' on Windows and macOS, which
+        imports the calling script again: a script with workers > 1 must then
+        run its code under ``if __name__ == '__main__':``.
+    grid : Grid or str, optional
+        Grid of the run, from open_grid(path). Default None uses the grid.nc
+        in `path`, read once per process.
+    dtype : str or numpy.dtype, optional
+        Data type of the output array. Default 'float64'. Use 'float32' to
+        halve the memory, data are then filled directly in float32.
 
     Returns
     -------
     numpy.ndarray
-        A 3D array with shape (ntime, ny, nx), dtype float64.
+        A 3D array with shape (ntime, ny, nx), dtype given by `dtype` (float64 by default).
         Missing files are represented with NaN values.
     """
 
@@ -383,22 +518,18 @@ def import_layer(path, var, tstart, tend, layer, ignore_missing='False'):
     if _missing_not_allowed(ignore_missing):
         _raise_if_missing(file_list)
 
-    # Open the grid file to determine depth dimensions
-    grid = os.path.join(path, 'grid.nc')
-    with Dataset(grid, 'r') as fgrid:
-        try:
-            depth_t = fgrid.variables['depth_%s' % (var[-1])][:]
-        except KeyError:
-            print('Could not find a grid suffix for %s. Using _t as default.' % (var))
-            depth_t = fgrid.variables['depth_t'][:]
+    # Read the grid (loaded once per process) to determine depth dimensions
+    grid = _as_grid(grid, path)
+    depth_t = grid.variable('depth', var)
 
     # Prepare output array filled with zeros
     # Shape: [time, depth_z, depth_y, depth_x]
     print('Processing path: %s at %s' % (path, datetime.now()))
-    data_array = np.zeros((duration.days + 1, np.size(depth_t, 1), np.size(depth_t, 2)), dtype='float64')
+    data_array = np.zeros((duration.days + 1, np.size(depth_t, 1), np.size(depth_t, 2)), dtype=dtype)
 
     # Loop through all files in the list
-    for i, fpath in enumerate(file_list):
+    index = np.s_[:, layer, :, :]
+    for i, fpath, data in _read_files(file_list, _read_field, (var, index), workers):
         tnow = tstart + timedelta(days=i)
 
         # Print the filename on the first day of each month (if available)
@@ -406,12 +537,9 @@ def import_layer(path, var, tstart, tend, layer, ignore_missing='False'):
             if fpath:
                 print(fpath)
 
-        # If the file exists, read the variable into the output array
+        # If the file exists, write the variable into the output array
         if fpath:
-            with Dataset(fpath, 'r') as file1:
-                data_array[i, :, :] = np.ma.filled(
-                    np.squeeze(file1.variables[var][:, layer, :, :]), np.nan
-                )
+            data_array[i, :, :] = data
 
         # If the file is missing, fill with NaN values
         if not fpath:
@@ -428,7 +556,7 @@ def import_layer(path, var, tstart, tend, layer, ignore_missing='False'):
 
 
 
-def import_depth(path, var, tstart, tend, depth, ignore_missing='False'):
+def import_depth(path, var, tstart, tend, depth, ignore_missing='False', workers=None, dtype='float64', grid=None):
     """
     Import a variable in specified depth from daily NetCDF files.
 
@@ -442,16 +570,30 @@ def import_depth(path, var, tstart, tend, depth, ignore_missing='False'):
         Start date (inclusive).
     tend : datetime
         End date (inclusive).
-    depth: float
-        The depth to import
+    depth: float or array_like
+        The depth to import. Give an array (e.g. [5, 10, 20, 50]) to import
+        several depths in one pass over the files.
     ignore_missing : str, optional
         If 'False' (default), the function exits when a file is missing.
         If 'True', missing days are allowed and filled with NaN.
+    workers : int, optional
+        Number of worker processes used to read and decode the files
+        concurrently. Default None reads the files one by one.
+        Worker processes are started with 'spawn' on Windows and macOS, which
+        imports the calling script again: a script with workers > 1 must then
+        run its code under ``if __name__ == '__main__':``.
+    grid : Grid or str, optional
+        Grid of the run, from open_grid(path). Default None uses the grid.nc
+        in `path`, read once per process.
+    dtype : str or numpy.dtype, optional
+        Data type of the output array. Default 'float64'. Use 'float32' to
+        halve the memory, data are then filled directly in float32.
 
     Returns
     -------
     numpy.ndarray
-        A 3D array with shape (ntime, ny, nx), dtype float64.
+        A 3D array with shape (ntime, ny, nx), or a 4D array with shape
+        (ntime, n_depth, ny, nx) if depth is an array, dtype given by `dtype` (float64 by default).
         Missing files are represented with NaN values.
     """
 
@@ -465,63 +607,132 @@ def import_depth(path, var, tstart, tend, depth, ignore_missing='False'):
     if _missing_not_allowed(ignore_missing):
         _raise_if_missing(file_list)
 
-    # Open the grid file to determine depth dimensions
-    grid = os.path.join(path, 'grid.nc')
-    with Dataset(grid, 'r') as fgrid:
-        try:
-            depth_t = fgrid.variables['depth_%s' % (var[-1])][:]
-            mask_ = fgrid.variables['mask_%s' % (var[-1])][:]
-        except KeyError:
-            print('Could not find a grid suffix for %s. Using _t as default.' % (var))
-            depth_t = fgrid.variables['depth_t'][:]
-            mask_ = fgrid.variables['mask_t'][:]
-
-    if mask_.ndim == 3:
-        mask_t = mask_[0, :, :]
-    elif mask_.ndim == 2:
-        mask_t = np.copy(mask_)
-
-
-
-    print (depth_t.shape, mask_t.shape)
-
-    # Prepare multiply array
-    if depth > 0:
-        depth = depth * -1
-        
-    # Find the indice of the min and max
-    # For example, the interest depth = 5, => -5 . the depth of two layer is -3 and -10. 
-    
-    toto= np.ma.masked_where(depth_t>depth, depth_t)
-    max_array= np.argmax(toto, axis=0) #because it is negative number, so it will return the nearest layer < depth (-10)
-    toto= np.ma.masked_where(depth_t<depth, depth_t)
-    min_array= np.argmin(toto, axis=0) #because it is negative number, so it will return the nearest layer > depth (-3)
-    
-    # Calculate the multiply factor:
-    multiply_array=np.zeros((np.size(depth_t,0),np.size(depth_t,1),np.size(depth_t,2)),dtype='float64')
-    for i in range(0, np.size(depth_t,1)):
-        for j in range(0, np.size(depth_t,2)):
-            if min_array[i,j] != max_array[i,j]:  #only take into account the point that have min and max indice
-                dis_tance = depth_t[max_array[i,j],i,j]-depth_t[min_array[i,j],i,j] 
-                multiply_array[max_array[i,j],i,j] = 1 +  (depth-depth_t[max_array[i,j],i,j])/dis_tance  #1+ -5/7 
-                multiply_array[min_array[i,j],i,j] = 1 -  (depth-depth_t[min_array[i,j],i,j])/dis_tance  #1- 2/7
-    
-    check_depth_array=np.zeros((  np.size(depth_t,1), np.size(depth_t,2)     ),dtype='float64')
-    for i in range(0, np.size(depth_t,1)):
-        for j in range(0, np.size(depth_t,2)):
-            if min_array[i,j]!=max_array[i,j]:  #only take into account the point that have min and max indice
-                check_depth_array[i,j]=1
+    # Read the grid (loaded once per process) to determine depth dimensions
+    grid = _as_grid(grid, path)
+    depth_t = grid.variable('depth', var)
+    mask_t = grid.mask(var)
+
+    # Calculate the multiply factor once for all the columns:
+    # only the nearest shallower and deeper layers of each column have a weight
+    k_shallow, k_deep, w_shallow, w_deep = depth_weights(depth_t, depth)
+    w_shallow = w_shallow.astype(dtype)
+    w_deep = w_deep.astype(dtype)
+    check_depth_array = np.isfinite(w_deep)  # columns that have both a shallower and a deeper layer
+
+    # Only the range of layers used by at least one column is read from the files
+    if np.any(check_depth_array):
+        k_start = int(min(k_shallow[check_depth_array].min(), k_deep[check_depth_array].min()))
+        k_end = int(max(k_shallow[check_depth_array].max(), k_deep[check_depth_array].max()))
+    else:
+        k_start, k_end = 0, 0
+    k_shallow = np.clip(k_shallow - k_start, 0, k_end - k_start)
+    k_deep = np.clip(k_deep - k_start, 0, k_end - k_start)
 
+    # Prepare output array filled with zeros
+    # Shape: [time, (n_depth), depth_y, depth_x]
+    print('Processing path: %s at %s' % (path, datetime.now()))
+    data_array = np.zeros((duration.days + 1,) + k_deep.shape, dtype=dtype)
 
+    # Loop through all files in the list
+    for i, fpath, data_toto in _read_files(file_list, _read_levels, (var, k_start, k_end), workers):
+        tnow = tstart + timedelta(days=i)
 
+        # Print the filename on the first day of each month (if available)
+        if tnow.day == 1:
+            if fpath:
+                print(fpath)
 
-    # Prepare output array filled with zeros
-    # Shape: [time, depth_z, depth_y, depth_x]
+        # If the file exists, interpolate the variable into the output array
+        if fpath:
+            levels, bottom = data_toto
+            data_toto2 = apply_depth_weights(levels, k_shallow, k_deep, w_shallow, w_deep) #BE CAREFUL. A NAN LAYER COUNTS AS 0, LIKE NANSUM
+            data_toto2[..., np.isnan(bottom)] = np.nan #filter all original nanvalue to be nan
+            data_toto2[~check_depth_array] = np.nan
+            data_toto2[..., mask_t==0] = np.nan # mask land - sea value
+            data_array[i] = data_toto2
+
+        # If the file is missing, fill with NaN values
+        if not fpath:
+            print(('File not found for:', str(tnow)), 'Missing values will be filled with NaN')
+            data_array[i] = np.nan
+
+    print('Import completed.')
+    return data_array
+
+
+
+
+#############################
+
+
+
+def import_many(path, variables, tstart, tend, ignore_missing='False', workers=None, dtype='float64'):
+    """
+    Import several variables from a sequence of daily NetCDF files in one sweep.
+
+    Each daily file is opened only once and all requested variables are read
+    from it, instead of reopening every file once per variable.
+
+    Parameters
+    ----------
+    path : str
+        Directory containing the NetCDF files.
+    variables : list of str
+        Variable names to read from each file (e.g., ['veloc_u', 'veloc_v', 'ssh']).
+        2D and 3D variables can be mixed, each one keeps its own grid (_t, _u, _v, ...).
+    tstart : datetime
+        Start date (inclusive).
+    tend : datetime
+        End date (inclusive).
+    ignore_missing : str, optional
+        If 'False' (default), the function exits when a file is missing.
+        If 'True', missing days are allowed and filled with NaN.
+    workers : int, optional
+        Number of worker processes used to read and decode the files
+        concurrently. Default None reads the files one by one.
+        Worker processes are started with 'spawn' on Windows and macOS, which
+        imports the calling script again: a script with workers > 1 must then
+        run its code under ``if __name__ == '__main__':``.
+    dtype : str or numpy.dtype, optional
+        Data type of the output array. Default 'float64'. Use 'float32' to
+        halve the memory, data are then filled directly in float32.
+
+    Returns
+    -------
+    dict of numpy.ndarray
+        One array per variable, with shape (ntime, ny, nx) for 2D variables
+        and (ntime, nz, ny, nx) for 3D variables, dtype given by `dtype` (float64 by default).
+        Missing files are represented with NaN values.
+    """
+
+    duration = tend - tstart
+    variables = list(variables)
+
+    # Build the file list (length always equals number of days between tstart and tend).
+    # Missing files are represented as empty strings "".
+    file_list = build_file_list(path, tstart, tend)
+
+    # If ignore_missing is 'False' and at least one file is missing → stop execution.
+    if _missing_not_allowed(ignore_missing):
+        _raise_if_missing(file_list)
+
+    # Read the shape of each variable from the first available file,
+    # so that each one is allocated on its own grid
+    first_file = next((fpath for fpath in file_list if fpath), None)
+    if first_file is None:
+        raise FileNotFoundError("No input file found between %s and %s." % (tstart, tend))
+    with Dataset(first_file, 'r') as file1:
+        shapes = [file1.variables[var].shape[1:] for var in variables]
+
+    # Prepare one output array per variable
+    # Shape: [time, (depth_z), depth_y, depth_x]
     print('Processing path: %s at %s' % (path, datetime.now()))
-    data_array = np.zeros((duration.days + 1, np.size(depth_t, 1), np.size(depth_t, 2)), dtype='float64')
+    data_dict = {}
+    for var, shape in zip(variables, shapes):
+        data_dict[var] = np.zeros((duration.days + 1,) + tuple(shape), dtype=dtype)
 
     # Loop through all files in the list
-    for i, fpath in enumerate(file_list):
+    for i, fpath, data_list in _read_files(file_list, _read_fields, (variables,), workers):
         tnow = tstart + timedelta(days=i)
 
         # Print the filename on the first day of each month (if available)
@@ -529,26 +740,100 @@ def import_depth(path, var, tstart, tend, depth, ignore_missing='False'):
             if fpath:
                 print(fpath)
 
-        # If the file exists, read the variable into the output array
+        # If the file exists, write every variable into its output array
         if fpath:
-            with Dataset(fpath, 'r') as file1:
-                data_toto = np.ma.filled(
-                    np.squeeze(file1.variables[var][:,:,:,:]), np.nan
-                )
-            
-            data_toto2 = np.nansum(data_toto * multiply_array, axis=0) #BE CAREFUL. NANSUM WILL RETURN 0 IF ALL NAN IN CALCULATION            
-            data_toto2[np.isnan(data_toto[0,:,:])] = np.nan #filter all original nanvalue to be nan
-            data_toto2[check_depth_array==0] = np.nan
-            data_toto2[mask_t==0] = np.nan # mask land - sea value
-            data_array[i,:,:] = np.copy(data_toto2)
+            for var, data in zip(variables, data_list):
+                data_dict[var][i] = data
 
         # If the file is missing, fill with NaN values
         if not fpath:
             print(('File not found for:', str(tnow)), 'Missing values will be filled with NaN')
-            data_array[i, :, :] = np.nan
+            for var in variables:
+                data_dict[var][i] = np.nan
 
     print('Import completed.')
-    return data_array
+    return data_dict
+
+
+
+
+#############################
+
+
+
+def iter_days(path, var, tstart, tend, selector=None, ignore_missing='False', dtype='float64'):
+    """
+    Iterate over a sequence of daily NetCDF files, one day at a time.
+
+    Unlike the import_* functions, nothing is accumulated: only one day is in
+    memory at a time, which allows running statistics over long records.
+
+    Parameters
+    ----------
+    path : str
+        Directory containing the NetCDF files.
+    var : str
+        Variable name to read from each file (e.g., 'veloc_u_t').
+    tstart : datetime
+        Start date (inclusive).
+    tend : datetime
+        End date (inclusive).
+    selector : tuple, optional
+        Index applied to the variable of each file, including the time
+        dimension, e.g. np.s_[:, -1, :, :] for the surface layer or
+        np.s_[:, :, 100:200, 50:80] for a sub-domain. Default None reads the
+        whole variable.
+    ignore_missing : str, optional
+        If 'False' (default), the function exits when a file is missing.
+        If 'True', missing days are allowed and filled with NaN.
+    dtype : str or numpy.dtype, optional
+        Data type of the yielded arrays. Default 'float64'.
+
+    Yields
+    ------
+    date : datetime
+        Date of the file.
+    data : numpy.ndarray
+        The selected (squeezed) data of that day. Missing files give an
+        array of NaN with the same shape.
+    """
+
+    if selector is None:
+        selector = Ellipsis
+
+    # Build the file list (length always equals number of days between tstart and tend).
+    # Missing files are represented as empty strings "".
+    file_list = build_file_list(path, tstart, tend)
+
+    # If ignore_missing is 'False' and at least one file is missing → stop execution.
+    if _missing_not_allowed(ignore_missing):
+        _raise_if_missing(file_list)
+
+    # Shape of one day, from the metadata of the first available file.
+    # A zero-stride view is enough to apply the selector without reading data.
+    first_file = next((fpath for fpath in file_list if fpath), None)
+    if first_file is None:
+        raise FileNotFoundError("No input file found between %s and %s." % (tstart, tend))
+    with Dataset(first_file, 'r') as file1:
+        var_shape = file1.variables[var].shape
+    day_shape = np.squeeze(np.broadcast_to(np.zeros((), dtype=dtype), var_shape)[selector]).shape
+
+    for i, fpath in enumerate(file_list):
+        tnow = tstart + timedelta(days=i)
+
+        # Print the filename on the first day of each month (if available)
+        if tnow.day == 1:
+            if fpath:
+                print(fpath)
+
+        # If the file exists, read the selection of that day
+        if fpath:
+            yield tnow, np.asarray(_read_field(fpath, var, selector), dtype=dtype)
+
+        # If the file is missing, fill with NaN values
+        if not fpath:
+            print(('File not found for:', str(tnow)), 'Missing values will be filled with NaN')
+            yield tnow, np.full(day_shape, np.nan, dtype=dtype)
 
 
 
@@ -598,11 +883,49 @@ def find_nearest_index_haversine(lat, lon, lat_p, lon_p):
 
 
 
+def _read_columns(fpath, var, index_list):
+    """Read one small hyperslab per station from one file (e.g. var[:, level, j, i])."""
+    with Dataset(fpath, 'r') as file1:
+        nc_var = file1.variables[var]
+        return np.array([np.ma.filled(np.squeeze(nc_var[index]), np.nan) for index in index_list])
+
+
+def _variable_ndim(file_list, var):
+    """Return the number of dimensions of var, read from the metadata of the first available file."""
+    for fpath in file_list:
+        if fpath:
+            with Dataset(fpath, 'r') as file1:
+                return file1.variables[var].ndim
+    raise FileNotFoundError("No input file found to read the dimensions of %s." % (var))
+
+
+def _station_indices(lat_t, lon_t, lat_j, lon_i, ji):
+    """Return the (j, i) grid indices of every station, as two 1D integer arrays."""
+    lat_j = np.atleast_1d(lat_j).ravel()
+    lon_i = np.atleast_1d(lon_i).ravel()
+    if lat_j.size != lon_i.size:
+        raise ValueError("lat_j and lon_i must have the same length.")
+
+    if ji == 'True':
+        return lat_j.astype(int), lon_i.astype(int)
 
-def import_point(path, var, tstart, tend, lat_j, lon_i, ji = 'False', level = -1, ignore_missing='False'):
+    # One batch query of the KD-tree of the grid (built once per grid)
+    j_ind, i_ind = spatial_index(lat_t, lon_t).query(lat_j, lon_i)
+    print ('Original location and nearest point location')
+    for k in range(lat_j.size):
+        print ('Lat', lat_j[k], lat_t[j_ind[k], i_ind[k]])
+        print ('Lon', lon_i[k], lon_t[j_ind[k], i_ind[k]])
+    return j_ind, i_ind
+
+
+
+def import_point(path, var, tstart, tend, lat_j, lon_i, ji = 'False', level = -1, ignore_missing='False', workers=None, dtype='float64', grid=None):
     """
     Import a data point from a variable of daily NetCDF files.
 
+    Only the [:, j, i] (2D variable) or [:, level, j, i] (3D variable) values
+    are read from each file. Several stations can be imported in one call.
+
     Parameters
     ----------
     path : str
@@ -613,10 +936,10 @@ def import_point(path, var, tstart, tend, lat_j, lon_i, ji = 'False', level = -1
         Start date (inclusive).
     tend : datetime
         End date (inclusive).
-    lat_j : float or int
-        Latitude or j to import
-    lon_j : float or int
-        Longitude or i to import
+    lat_j : float or int, or array_like
+        Latitude or j to import. Give an array to import several stations.
+    lon_i : float or int, or array_like
+        Longitude or i to import. Same length as lat_j.
     ji : str, optional
         If 'False' (default), the function will find i and j based on lat and lon provided
         If 'True', the function will use i and j directly to import
@@ -625,11 +948,24 @@ def import_point(path, var, tstart, tend, lat_j, lon_i, ji = 'False', level = -1
     ignore_missing : str, optional
         If 'False' (default), the function exits when a file is missing.
         If 'True', missing days are allowed and filled with NaN.
+    workers : int, optional
+        Number of worker processes used to read and decode the files
+        concurrently. Default None reads the files one by one.
+        Worker processes are started with 'spawn' on Windows and macOS, which
+        imports the calling script again: a script with workers > 1 must then
+        run its code under ``if __name__ == '__main__':``.
+    grid : Grid or str, optional
+        Grid of the run, from open_grid(path). Default None uses the grid.nc
+        in `path`, read once per process.
+    dtype : str or numpy.dtype, optional
+        Data type of the output array. Default 'float64'. Use 'float32' to
+        halve the memory, data are then filled directly in float32.
 
     Returns
     -------
     numpy.ndarray
-        A 3D array with shape (ntime, ny, nx), dtype float64.
+        A 1D array with shape (ntime,) for a single station, or a 2D array
+        with shape (n_station, ntime) when lat_j and lon_i are arrays, dtype given by `dtype` (float64 by default).
         Missing files are represented with NaN values.
     """
 
@@ -643,27 +979,31 @@ def import_point(path, var, tstart, tend, lat_j, lon_i, ji = 'False', level = -1
     if _missing_not_allowed(ignore_missing):
         _raise_if_missing(file_list)
 
-    # Open the grid file to determine depth dimensions
-    grid = os.path.join(path, 'grid.nc')
-    with Dataset(grid, 'r') as fgrid:
-        try:
-            lat_t = fgrid.variables['latitude_%s' % (var[-1])][:]
-            lon_t = fgrid.variables['longitude_%s' % (var[-1])][:]
-        except KeyError:
-            print('Could not find a grid suffix for %s. Using _t as default.' % (var))
-            lat_t = fgrid.variables['latitude_t'][:]
-            lon_t = fgrid.variables['longitude_t'][:]
-
+    # Read the grid (loaded once per process) to locate the stations
+    grid = _as_grid(grid, path)
+    lat_t = grid.variable('latitude', var)
+    lon_t = grid.variable('longitude', var)
 
+    # Find the grid points once, they are the same for every file
+    j_ind, i_ind = _station_indices(lat_t, lon_t, lat_j, lon_i, ji)
 
+    # Check if data is 2D (time, y, x) or 3D (time, z, y, x) from the metadata,
+    # then build the hyperslab to read for each station
+    data_dim = _variable_ndim(file_list, var)
+    if data_dim == 3:
+        index_list = [(slice(None), j, i) for j, i in zip(j_ind, i_ind)]
+    elif data_dim == 4:
+        index_list = [(slice(None), level, j, i) for j, i in zip(j_ind, i_ind)]
+    else:
+        raise ValueError('Data dimension = %d. Please check again...' % (data_dim))
 
     # Prepare output array filled with zeros
-    # Shape: [time, depth_z, depth_y, depth_x]
+    # Shape: [station, time]
     print('Processing path: %s at %s' % (path, datetime.now()))
-    data_array = np.zeros((duration.days + 1), dtype='float64')
-    kount_print=0
+    data_array = np.zeros((len(index_list), duration.days + 1), dtype=dtype)
+
     # Loop through all files in the list
-    for i, fpath in enumerate(file_list):
+    for i, fpath, data in _read_files(file_list, _read_columns, (var, index_list), workers):
         tnow = tstart + timedelta(days=i)
 
         # Print the filename on the first day of each month (if available)
@@ -671,45 +1011,18 @@ def import_point(path, var, tstart, tend, lat_j, lon_i, ji = 'False', level = -1
             if fpath:
                 print(fpath)
 
-        # If the file exists, read the variable into the output array
+        # If the file exists, write the variable into the output array
         if fpath:
-            with Dataset(fpath, 'r') as file1:
-
-                # Check if data is 2D or 3D
-                data_toto = np.squeeze(file1.variables[var][:])
-                data_dim = data_toto.ndim
-
-                # Case 1: load 2D var:
-                if data_dim ==2:
-                    if ji == 'True':
-                        j_ind, i_ind = int(lat_j), int(lon_i)
-                    else:
-                        j_ind, i_ind = find_nearest_index_haversine(lat_t, lon_t, lat_j, lon_i)
-                        if kount_print ==0:
-                            print ('Original location and nearest point location')
-                            print ('Lat', lat_j, lat_t[j_ind, i_ind])
-                            print ('Lon', lon_i, lon_t[j_ind, i_ind])
-                            kount_print+=1
-                    data_array[i] = np.squeeze(file1.variables[var][:, j_ind, i_ind])
-
-                # Case 2: load 3D var
-                elif data_dim ==3:
-                    if ji == 'True':
-                        j_ind, i_ind = int(lat_j), int(lon_i)
-                    else:
-                        j_ind, i_ind = find_nearest_index_haversine(lat_t, lon_t, lat_j, lon_i)
-                        if kount_print ==0:
-                            print ('Lat', lat_j, 'Nearest point', lat_t[j_ind, i_ind])
-                            print ('Lon', lon_i, 'Nearest point', lon_t[j_ind, i_ind])
-                            kount_print +=1
-                    data_array[i] = np.squeeze(file1.variables[var][:, level, j_ind, i_ind])
+            data_array[:, i] = data
 
         # If the file is missing, fill with NaN values
         if not fpath:
             print(('File not found for:', str(tnow)), 'Missing values will be filled with NaN')
-            data_array[i] = np.nan
+            data_array[:, i] = np.nan
 
     print('Import completed.')
+    if np.ndim(lat_j) == 0:
+        return data_array[0]
     return data_array
 
 
@@ -718,9 +1031,12 @@ def import_point(path, var, tstart, tend, lat_j, lon_i, ji = 'False', level = -1
 
 
 
-def import_profile(path, var, tstart, tend, lat_j, lon_i, ji = 'False', ignore_missing='False'):
+def import_profile(path, var, tstart, tend, lat_j, lon_i, ji = 'False', ignore_missing='False', workers=None, dtype='float64', grid=None):
     """
-    Import a data point from a variable of daily NetCDF files.
+    Import a vertical profile from a variable of daily NetCDF files.
+
+    Only the [:, :, j, i] column is read from each file. Several stations
+    can be imported in one call.
 
     Parameters
     ----------
@@ -732,24 +1048,37 @@ def import_profile(path, var, tstart, tend, lat_j, lon_i, ji = 'False', ignore_m
         Start date (inclusive).
     tend : datetime
         End date (inclusive).
-    lat_j : float or int
-        Latitude or j to import
-    lon_j : float or int
-        Longitude or i to import
+    lat_j : float or int, or array_like
+        Latitude or j to import. Give an array to import several stations.
+    lon_i : float or int, or array_like
+        Longitude or i to import. Same length as lat_j.
     ji : str, optional
         If 'False' (default), the function will find i and j based on lat and lon provided
         If 'True', the function will use i and j directly to import
-    level : int, optinal
-        level that we want to import. Only support for 3D field. Default is surface layer
     ignore_missing : str, optional
         If 'False' (default), the function exits when a file is missing.
         If 'True', missing days are allowed and filled with NaN.
+    workers : int, optional
+        Number of worker processes used to read and decode the files
+        concurrently. Default None reads the files one by one.
+        Worker processes are started with 'spawn' on Windows and macOS, which
+        imports the calling script again: a script with workers > 1 must then
+        run its code under ``if __name__ == '__main__':``.
+    grid : Grid or str, optional
+        Grid of the run, from open_grid(path). Default None uses the grid.nc
+        in `path`, read once per process.
+    dtype : str or numpy.dtype, optional
+        Data type of the output array. Default 'float64'. Use 'float32' to
+        halve the memory, data are then filled directly in float32.
 
     Returns
     -------
-    numpy.ndarray
-        A 3D array with shape (ntime, ny, nx), dtype float64.
+    data_array : numpy.ndarray
+        A 2D array with shape (ntime, nz) for a single station, or a 3D array
+        with shape (n_station, ntime, nz) when lat_j and lon_i are arrays, dtype given by `dtype` (float64 by default).
         Missing files are represented with NaN values.
+    index : numpy.ndarray
+        The (j, i) index of the station, shape (2,), or (n_station, 2) for several stations.
     """
 
     duration = tend - tstart
@@ -762,28 +1091,29 @@ def import_profile(path, var, tstart, tend, lat_j, lon_i, ji = 'False', ignore_m
     if _missing_not_allowed(ignore_missing):
         _raise_if_missing(file_list)
 
-    # Open the grid file to determine depth dimensions
-    grid = os.path.join(path, 'grid.nc')
-    with Dataset(grid, 'r') as fgrid:
-        try:
-            lat_t = fgrid.variables['latitude_%s' % (var[-1])][:]
-            lon_t = fgrid.variables['longitude_%s' % (var[-1])][:]
-            depth_t = fgrid.variables['depth_%s' % (var[-1])][:]
-        except KeyError:
-            print('Could not find a grid suffix for %s. Using _t as default.' % (var))
-            lon_t = fgrid.variables['longitude_t'][:]
-            lat_t = fgrid.variables['latitude_t'][:]
-            depth_t = fgrid.variables['depth_t'][:]
+    # Read the grid (loaded once per process) to locate the stations and the depth dimensions
+    grid = _as_grid(grid, path)
+    lat_t = grid.variable('latitude', var)
+    lon_t = grid.variable('longitude', var)
+    depth_t = grid.variable('depth', var)
+
+    # Find the grid points once, they are the same for every file
+    j_ind, i_ind = _station_indices(lat_t, lon_t, lat_j, lon_i, ji)
+    index = np.stack([j_ind, i_ind], axis=-1).astype(float)   # contain index
 
+    # Check if data is 3D (time, z, y, x) from the metadata
+    data_dim = _variable_ndim(file_list, var)
+    if data_dim != 4:
+        raise ValueError('Data dimension = %d. Please check again...' % (data_dim - 1))
+    index_list = [(slice(None), slice(None), j, i) for j, i in zip(j_ind, i_ind)]
 
     # Prepare output array filled with zeros
-    # Shape: [time, depth_z, depth_y, depth_x]
+    # Shape: [station, time, depth_z]
     print('Processing path: %s at %s' % (path, datetime.now()))
-    data_array = np.zeros((duration.days + 1, np.size(depth_t,0)), dtype='float64')
-    index = np.zeros((2))   # contain index
-    kount_print=0
+    data_array = np.zeros((len(index_list), duration.days + 1, np.size(depth_t,0)), dtype=dtype)
+
     # Loop through all files in the list
-    for i, fpath in enumerate(file_list):
+    for i, fpath, data in _read_files(file_list, _read_columns, (var, index_list), workers):
         tnow = tstart + timedelta(days=i)
 
         # Print the filename on the first day of each month (if available)
@@ -791,48 +1121,123 @@ def import_profile(path, var, tstart, tend, lat_j, lon_i, ji = 'False', ignore_m
             if fpath:
                 print(fpath)
 
-        # If the file exists, read the variable into the output array
+        # If the file exists, write the variable into the output array
         if fpath:
-            with Dataset(fpath, 'r') as file1:
-
-                # Check if data is 2D or 3D
-                data_toto = np.squeeze(file1.variables[var][:])
-                data_dim = data_toto.ndim
-
-                # Case 1: load 2D var:
-                if data_dim ==2:
-                    raise ValueError('Data dimension = 2. Please check again...')
-
-                # Case 2: load 3D var
-                elif data_dim ==3:
-                    if ji == 'True':
-                        j_ind, i_ind = int(lat_j), int(lon_i)
-                    else:
-                        j_ind, i_ind = find_nearest_index_haversine(lat_t, lon_t, lat_j, lon_i)
-                        if kount_print ==0:
-                            print ('Original location and nearest point location')
-                            print ('Lat', lat_j, lat_t[j_ind, i_ind])
-                            print ('Lon', lon_i, lon_t[j_ind, i_ind])
-                            kount_print +=1
-                    index[0] = j_ind
-                    index[1] = i_ind
-                    data_array[i,:] = np.squeeze(file1.variables[var][:, :, j_ind, i_ind])
+            data_array[:, i, :] = data
 
         # If the file is missing, fill with NaN values
         if not fpath:
             print(('File not found for:', str(tnow)), 'Missing values will be filled with NaN')
-            data_array[i] = np.nan
+            data_array[:, i, :] = np.nan
 
     print('Import completed.')
+    if np.ndim(lat_j) == 0:
+        return data_array[0], index[0]
     return data_array, index
 
 
 
+#############################
 
 
+def _read_box(fpath, var, slice_y, slice_x):
+    """Read the (nz, box_y, box_x) box of the first time step of var, with masked values filled by NaN."""
+    with Dataset(fpath, 'r') as file1:
+        return np.ma.filled(file1.variables[var][0, ..., slice_y, slice_x], np.nan)
 
 
+def import_section_series(path, var, tstart, tend, lon_min, lon_max, lat_min, lat_max, M, depth_interval,
+                          ignore_missing='False', workers=None, dtype='float64', grid=None, operator=None):
+    """
+    Import a vertical section through time (Hovmöller diagram along a transect) from daily NetCDF files.
+
+    The section geometry is computed once. For each day, only the box of grid
+    cells that touch the section is read, instead of the whole 3D field.
 
+    Parameters
+    ----------
+    path : str
+        Directory containing the NetCDF files and grid.nc.
+    var : str
+        Variable name to read from each file (e.g., 'tem').
+    tstart : datetime
+        Start date (inclusive).
+    tend : datetime
+        End date (inclusive).
+    lon_min, lon_max, lat_min, lat_max : float
+        Limits of the line. If lon_min = lon_max, it is treated as a line along longitude, and vice versa.
+    M : int
+        Number of points in the section following its direction from A to B.
+    depth_interval : float
+        Interval of Z.
+    ignore_missing : str, optional
+        If 'False' (default), the function exits when a file is missing.
+        If 'True', missing days are allowed and filled with NaN.
+    workers : int, optional
+        Number of worker processes used to read and decode the files
+        concurrently. Default None reads the files one by one.
+        Worker processes are started with 'spawn' on Windows and macOS, which
+        imports the calling script again: a script with workers > 1 must then
+        run its code under ``if __name__ == '__main__':``.
+    dtype : str or numpy.dtype, optional
+        Data type of the output array. Default 'float64'.
+    grid : Grid or str, optional
+        Grid of the run, from open_grid(path). Default None uses the grid.nc
+        in `path`, read once per process.
+    operator : SectionOperator or str, optional
+        Section operator (or its .npz file) from section_extract. It skips the
+        computation of the section geometry; lon_min, lon_max, lat_min,
+        lat_max and M are then ignored.
 
+    Returns
+    -------
+    new_depth : ndarray of shape (K,)
+        Regular depth grid shared by all the columns of the section.
+    data_out : ndarray of shape (ntime, K, M)
+        Interpolated data on new_depth for each day. Missing days are NaN.
+    """
 
+    duration = tend - tstart
 
+    # Build the file list (length always equals number of days between tstart and tend).
+    # Missing files are represented as empty strings "".
+    file_list = build_file_list(path, tstart, tend)
+
+    # If ignore_missing is 'False' and at least one file is missing → stop execution.
+    if _missing_not_allowed(ignore_missing):
+        _raise_if_missing(file_list)
+
+    # Section geometry, and the same operator for the box of cells around the section
+    operator = _section_operator(path, var, lon_min, lon_max, lat_min, lat_max, M, grid, operator)
+    slice_y, slice_x = operator.bounding_box()
+    box_operator = operator.crop(slice_y, slice_x)
+    depth_sec = operator.depth
+
+    # Shape: [time, depth, point]
+    print('Processing path: %s at %s' % (path, datetime.now()))
+    data_sec = np.zeros((duration.days + 1,) + depth_sec.shape, dtype=dtype)
+
+    # Loop through all files in the list
+    for i, fpath, data in _read_files(file_list, _read_box, (var, slice_y, slice_x), workers):
+        tnow = tstart + timedelta(days=i)
+
+        # Print the filename on the first day of each month (if available)
+        if tnow.day == 1:
+            if fpath:
+                print(fpath)
+
+        # If the file exists, interpolate the box onto the section
+        if fpath:
+            data_sec[i] = box_operator(data)
+
+        # If the file is missing, fill with NaN values
+        if not fpath:
+            print(('File not found for:', str(tnow)), 'Missing values will be filled with NaN')
+            data_sec[i] = np.nan
+
+    # Interpolate depth and data into the regular depth grid, all days at once
+    z1d, data_out = _data_interp(depth_sec, data_sec, depth_interval=depth_interval)
+    data_out = data_out.astype(dtype, copy=False)
+
+    print('Import completed.')
+    return z1d, data_out
@@ -1,9 +1,13 @@
 import numpy as np
 
-def interpolate_to_t(A, *, stagger: str, mask_t: np.ndarray):
+def interpolate_to_t(A, *, stagger: str, mask_t: np.ndarray, out=None, single_src=True):
     """
     Interpolate a staggered field (U or V) onto the T grid.
 
+    The result is computed in place in the output array (no intermediate
+    copies of the full field), which keeps the peak memory low for 4D daily
+    U/V stacks.
+
     Parameters
     ----------
     A : ndarray
@@ -14,14 +18,23 @@ def interpolate_to_t(A, *, stagger: str, mask_t: np.ndarray):
         Type of staggering.
     mask_t : ndarray of 0 and 1
         0: land point. Will be considered as nan value
+    out : ndarray, optional
+        Output buffer with shape (..., ny_t, nx_t), e.g. reused between
+        calls. Default None allocates a new array (dtype of A, or float if A
+        is not a floating array).
+    single_src : bool, optional
+        If False, the single_src diagnostic is not computed and None is
+        returned in its place. Default True.
 
     Returns
     -------
     T : ndarray
         Interpolated values on T grid, shape (..., ny_t, nx_t), masked as NaN where mask_t is True.
-    single_src : ndarray (uint8)
+        This is `out` if it was given.
+    single_src : ndarray (uint8) or None
         1 where T was computed from exactly one valid neighbor, 0 otherwise.
         (Interior points with two valid neighbors → 0; points with both neighbors NaN → 0.)
+        None if single_src=False.
     """
     A = np.asarray(A)
     mask_t = np.asarray(mask_t, dtype=bool)
@@ -35,81 +48,58 @@ def interpolate_to_t(A, *, stagger: str, mask_t: np.ndarray):
     if stagger.lower() == 'u':
         if A.shape[-2] != ny_t or A.shape[-1] != nx_t - 1:
             raise ValueError(f"U shape {-2, -1} must be (ny_t, nx_t-1) = ({ny_t}, {nx_t-1}), got {A.shape[-2:]}")
-        # Prepare output
-        T = np.full(A.shape[:-1] + (nx_t,), np.nan, dtype=A.dtype)
-        single = np.zeros_like(T, dtype=np.uint8)
-
-        # Interior columns i=1..nx_t-2 use left/right U: u[i-1], u[i]
-        if nx_t >= 3:
-            left  = A[..., :, 0:-1-0]    # u[0..nx_t-2-1] = u[0..nx_t-3]
-            right = A[..., :, 1:      ]  # u[1..nx_t-2]
-            # Align to T[..., :, 1:-1]
-            both_ok = np.isfinite(left) & np.isfinite(right)
-            left_ok = np.isfinite(left) & ~np.isfinite(right)
-            right_ok= ~np.isfinite(left) & np.isfinite(right)
-
-            T[..., :, 1:-1] = np.where(
-                both_ok, 0.5*(left + right),
-                np.where(left_ok, left,
-                         np.where(right_ok, right, np.nan))
-            )
-            single[..., :, 1:-1] = (left_ok | right_ok).astype(np.uint8)
-
-        # Left edge i=0 uses u[0]
-        u0 = A[..., :, 0]
-        ok0 = np.isfinite(u0)
-        T[..., :, 0] = np.where(ok0, u0, np.nan)
-        single[..., :, 0] = ok0.astype(np.uint8)  # single source if valid
-
-        # Right edge i=nx_t-1 uses u[-1]
-        u_last = A[..., :, -1]
-        okL = np.isfinite(u_last)
-        T[..., :, -1] = np.where(okL, u_last, np.nan)
-        single[..., :, -1] = okL.astype(np.uint8)
-
     elif stagger.lower() == 'v':
         if A.shape[-2] != ny_t - 1 or A.shape[-1] != nx_t:
             raise ValueError(f"V shape {-2, -1} must be (ny_t-1, nx_t) = ({ny_t-1}, {nx_t}), got {A.shape[-2:]}")
-        # Prepare output
-        T = np.full(A.shape[:-2] + (ny_t, nx_t), np.nan, dtype=A.dtype)
-        single = np.zeros_like(T, dtype=np.uint8)
-
-        # Interior rows j=1..ny_t-2 use bottom/top V: v[j-1], v[j]
-        if ny_t >= 3:
-            bot = A[..., 0:-1, :]   # v[0..ny_t-2-1]
-            top = A[..., 1:  , :]   # v[1..ny_t-2]
-            both_ok = np.isfinite(bot) & np.isfinite(top)
-            bot_ok  = np.isfinite(bot) & ~np.isfinite(top)
-            top_ok  = ~np.isfinite(bot) & np.isfinite(top)
-
-            T[..., 1:-1, :] = np.where(
-                both_ok, 0.5*(bot + top),
-                np.where(bot_ok, bot,
-                         np.where(top_ok, top, np.nan))
-            )
-            single[..., 1:-1, :] = (bot_ok | top_ok).astype(np.uint8)
-
-        # Bottom edge j=0 uses v[0]
-        v0 = A[..., 0, :]
-        ok0 = np.isfinite(v0)
-        T[..., 0, :] = np.where(ok0, v0, np.nan)
-        single[..., 0, :] = ok0.astype(np.uint8)
-
-        # Top edge j=ny_t-1 uses v[-1]
-        v_last = A[..., -1, :]
-        okL = np.isfinite(v_last)
-        T[..., -1, :] = np.where(okL, v_last, np.nan)
-        single[..., -1, :] = okL.astype(np.uint8)
-
     else:
         raise ValueError("stagger must be 'u' or 'v'.")
 
-    # Apply T mask (True → NaN and mark single=0)
-    # Broadcast mask_t to leading dims if needed
-    if mask_t.shape != T.shape[-2:]:
-        # Allow broadcasting for leading dims only; last two must match
-        pass
-    T = np.where(mask_t == 0, np.nan, T)
-    single = np.where(mask_t == 0, 0, single).astype(np.uint8)
+    # Prepare output
+    shape = A.shape[:-2] + (ny_t, nx_t)
+    if out is None:
+        T = np.empty(shape, dtype=A.dtype if np.issubdtype(A.dtype, np.floating) else float)
+    elif out.shape != shape:
+        raise ValueError(f"out must have shape {shape}, got {out.shape}")
+    else:
+        T = out
+    single = np.zeros(shape, dtype=np.uint8) if single_src else None
+
+    # Work along the last axis: V fields are seen with (x, y) swapped, so that
+    # T[..., i] is computed from A[..., i-1] and A[..., i] for both staggers
+    if stagger.lower() == 'v':
+        A_x = np.swapaxes(A, -1, -2)
+        T_x = np.swapaxes(T, -1, -2)
+        single_x = None if single is None else np.swapaxes(single, -1, -2)
+    else:
+        A_x, T_x, single_x = A, T, single
+
+    # Edges use their single neighbor (first and last U/V point)
+    T_x[..., 0] = A_x[..., 0]
+    T_x[..., -1] = A_x[..., -1]
+    if single is not None:
+        single_x[..., 0] = np.isfinite(A_x[..., 0])
+        single_x[..., -1] = np.isfinite(A_x[..., -1])
+
+    # Interior points use the mean of their two neighbors, or the only valid one
+    if T_x.shape[-1] >= 3:
+        first = A_x[..., :-1]
+        second = A_x[..., 1:]
+        interior = T_x[..., 1:-1]
+        first_bad = ~np.isfinite(first)
+        second_bad = ~np.isfinite(second)
+        with np.errstate(invalid='ignore'):
+            np.add(first, second, out=interior)
+        interior *= 0.5
+        np.copyto(interior, second, where=first_bad)
+        np.copyto(interior, first, where=second_bad)
+        if single is not None:
+            np.not_equal(first_bad, second_bad, out=single_x[..., 1:-1])
+
+    # Points without valid neighbor and land points (mask_t == 0) → NaN (and single=0)
+    bad = ~np.isfinite(T)
+    bad |= ~mask_t
+    np.copyto(T, np.nan, where=bad)
+    if single is not None:
+        np.copyto(single, 0, where=~mask_t)
 
     return T, single
@@ -1,6 +1,9 @@
+from functools import lru_cache
+
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib import colors
+from matplotlib.collections import LineCollection
 from mpl_toolkits.basemap import Basemap
 import random
 import matplotlib.colors as mcolors
@@ -149,6 +152,89 @@ def _nice_ticks_1d(dmin, dmax, max_ticks=5):
 
 
 
+#########################################################
+# Basemap cache: building a Basemap reads and clips the coastline database,
+# which is the slowest part of drawing a map. Maps with the same bounds and
+# options share one Basemap, and the least recently used ones are dropped.
+
+_BASEMAP_CACHE_SIZE = 16
+
+
+@lru_cache(maxsize=_BASEMAP_CACHE_SIZE)
+def _basemap(bounds, resolution, projection, epsg, shapefile, layer_name):
+    lon_min, lon_max, lat_min, lat_max = bounds
+    kwargs = {} if epsg is None else {'epsg': epsg}
+    m = Basemap(projection=projection, llcrnrlon=lon_min, llcrnrlat=lat_min,
+                urcrnrlon=lon_max, urcrnrlat=lat_max, resolution=resolution, **kwargs)
+    if shapefile is not None:
+        # Read and project the shapes once, they are drawn by _draw_shapefile
+        m.readshapefile(shapefile, layer_name, drawbounds=False)
+    return m
+
+
+def cached_basemap(lon_min, lon_max, lat_min, lat_max, resolution='i', projection='merc',
+                   epsg=None, shapefile=None, layer_name=None, ax=None):
+    """
+    Return a Basemap of the given bounds, built only once for the same options.
+
+    Basemaps are kept in a least recently used cache of 16 maps keyed by
+    (bounds, resolution, projection, epsg, shapefile, layer_name), so drawing
+    many maps of the same region (e.g. the frames of an animation) loads the
+    coastline only once.
+
+    Parameters
+    ----------
+    lon_min, lon_max, lat_min, lat_max : float
+        Boundaries of the map.
+    resolution : str, optional
+        Resolution of the coastline database ('c', 'l', 'i', 'h', 'f' or None). Default 'i'.
+    projection : str, optional
+        Map projection. Default 'merc'.
+    epsg : int, optional
+        EPSG code of the projection (e.g. 4326), as in Basemap.
+    shapefile, layer_name : str, optional
+        Custom coastline shapefile (path without extension) and layer name.
+        The shapes are read once and drawn with _draw_shapefile.
+    ax : matplotlib.axes.Axes, optional
+        Axes used by the drawing methods of the map. Default: current axes.
+
+    Returns
+    -------
+    Basemap
+        The shared Basemap. Do not modify it other than through its drawing methods.
+    """
+    m = _basemap((float(lon_min), float(lon_max), float(lat_min), float(lat_max)),
+                 resolution, projection, epsg, shapefile, layer_name)
+    # The Basemap is shared between figures: draw on this call's axes
+    m.ax = ax
+    # Recent Basemap versions remember the axes they have set up in the private
+    # set _initialized_axes. Forget the axes of previous figures so that they
+    # can be freed; versions without this set are left untouched.
+    initialized = getattr(m, '_initialized_axes', None)
+    if isinstance(initialized, set):
+        initialized.clear()
+    return m
+
+
+def clear_basemap_cache():
+    """Drop all cached Basemaps."""
+    _basemap.cache_clear()
+
+
+def _draw_shapefile(m, layer_name, linewidth=1, color='k', zorder=None):
+    """Draw the shapes of a cached_basemap, like Basemap.readshapefile(..., drawbounds=True)."""
+    ax = m.ax or plt.gca()
+    lines = LineCollection(getattr(m, layer_name), antialiaseds=(1,))
+    lines.set_color(color)
+    lines.set_linewidth(linewidth)
+    lines.set_label('_nolabel_')
+    if zorder is not None:
+        lines.set_zorder(zorder)
+    ax.add_collection(lines)
+    m.set_axes_limits(ax=ax)
+    return lines
+
+
 #########################################################
 
 def map_draw(lon_min, lon_max, lat_min, lat_max, title, lon_data, lat_data, data_draw, path_save, name_save, 
@@ -215,8 +301,8 @@ def map_draw(lon_min, lon_max, lat_min, lat_max, title, lon_data, lat_data, data
     ax = fig.add_subplot(1,1,1)
     ax.set_title('%s' % (title))
 
-    map2 = Basemap(projection='merc', llcrnrlon=lon_min, llcrnrlat=lat_min,
-                   urcrnrlon=lon_max, urcrnrlat=lat_max, resolution='i', epsg=4326)
+    map2 = cached_basemap(lon_min, lon_max, lat_min, lat_max, resolution='i', epsg=4326,
+                          shapefile=custom_coastline, layer_name=layer_name)
 
     parallels = _nice_ticks_1d(np.nanmin(lat_data), np.nanmax(lat_data))  #horizontal line
     meridians = _nice_ticks_1d(np.nanmin(lon_data), np.nanmax(lon_data))  #vertical line
@@ -226,7 +312,7 @@ def map_draw(lon_min, lon_max, lat_min, lat_max, title, lon_data, lat_data, data
     if custom_coastline is None:
         map2.drawcoastlines(zorder=10)
     else: 
-        map2.readshapefile(custom_coastline, layer_name, linewidth=1, color='k', zorder = 20)
+        _draw_shapefile(map2, layer_name, linewidth=1, color='k', zorder=20)
 
     # -------- Auto colorbar limits and nice ticks --------
     finite_vals = np.asarray(data_draw)[np.isfinite(data_draw)]
@@ -328,8 +414,7 @@ def map_draw_point(lon_min, lon_max, lat_min, lat_max, title, lon_data, lat_data
     ax = fig.add_subplot(1,1,1)
     ax.set_title('%s' % (title))
 
-    map2 = Basemap(projection='merc', llcrnrlon=lon_min, llcrnrlat=lat_min,
-                   urcrnrlon=lon_max, urcrnrlat=lat_max, resolution='i', epsg=4326)
+    map2 = cached_basemap(lon_min, lon_max, lat_min, lat_max, resolution='i', epsg=4326)
 
     parallels = _nice_ticks_1d(np.nanmin(lat_data), np.nanmax(lat_data))  #horizontal line
     meridians = _nice_ticks_1d(np.nanmin(lon_data), np.nanmax(lon_data))  #vertical line
@@ -441,8 +526,7 @@ def map_draw_box(lon_min, lon_max, lat_min, lat_max, title, lon_data, lat_data,
     ax = fig.add_subplot(1,1,1)
     ax.set_title('%s' % (title))
 
-    map2 = Basemap(projection='merc', llcrnrlon=lon_min, llcrnrlat=lat_min,
-                   urcrnrlon=lon_max, urcrnrlat=lat_max, resolution='i', epsg=4326)
+    map2 = cached_basemap(lon_min, lon_max, lat_min, lat_max, resolution='i', epsg=4326)
 
     parallels = _nice_ticks_1d(np.nanmin(lat_data), np.nanmax(lat_data))  #horizontal line
     meridians = _nice_ticks_1d(np.nanmin(lon_data), np.nanmax(lon_data))  #vertical line
@@ -596,12 +680,7 @@ def map_draw_uv(
     ax = fig.add_subplot(1,1,1)
     ax.set_title(f"{title}")
 
-    map2 = Basemap(
-        projection='merc',
-        llcrnrlon=lon_min, llcrnrlat=lat_min,
-        urcrnrlon=lon_max, urcrnrlat=lat_max,
-        resolution='i', epsg=4326
-    )
+    map2 = cached_basemap(lon_min, lon_max, lat_min, lat_max, resolution='i', epsg=4326)
 
     # Grid lines and coast
     parallels = _nice_ticks_1d(np.nanmin(lat_data), np.nanmax(lat_data))
@@ -0,0 +1,382 @@
+import numpy as np
+
+from GINCCO_lib.modules.helpers import _float_dtype, _missing_not_allowed
+from GINCCO_lib.modules.temporal_mean import _variance, _welford_update
+
+#############################
+'''
+This module gives running statistics that are updated one day at a time.
+
+List of classes:
+* RunningMean: mean of each grid point
+* RunningVariance: mean, variance and standard deviation of each grid point (Welford)
+* RunningMinMax: minimum and maximum of each grid point
+* RunningHistogram: histogram of all values, or of each grid point, and approximate quantiles
+
+Features:
+* update(day_array) adds one day, result() returns the statistics of all days added so far
+* NaN (e.g. land) and masked values are ignored point by point
+* Missing days (update(None)) follow the ignore_missing option of the import functions
+* The state can be saved to a .npz file and loaded again, so an operational run
+  can add today's file to the statistics of the previous days without reading them again
+
+Example:
+    stats = RunningVariance(ignore_missing='True')
+    for date, day in iter_days(path, 'tem', tstart, tend, selector=np.s_[:, -1, :, :]):
+        stats.update(day)
+    stats.save('sst_stats.npz')
+    ...
+    stats = RunningVariance.load('sst_stats.npz')
+    stats.update(today_sst)
+    sst_std = stats.std()
+'''
+#############################
+
+# Number of histogram counts processed at once by RunningHistogram.quantile
+_QUANTILE_TILE = 2 ** 22
+
+
+class _RunningStatistic:
+    """
+    Base class of the running statistics.
+
+    Subclasses list their state arrays in `_state`, create them in `_start`
+    and update them in `_update(x, valid)`, where x has NaN set to 0.
+    """
+
+    _state = ()
+
+    def __init__(self, ignore_missing='False'):
+        self.ignore_missing = str(ignore_missing)
+        self.shape = None
+        self.dtype = None
+        self.n_days = 0
+        self.n_missing = 0
+
+    def __repr__(self):
+        return '%s(shape=%s, n_days=%d, n_missing=%d)' % (
+            type(self).__name__, self.shape, self.n_days, self.n_missing)
+
+    def update(self, day_array):
+        """
+        Add one day.
+
+        Parameters
+        ----------
+        day_array : np.ndarray or None
+            Data of the day. NaN and masked values are ignored. None is a
+            missing day: with ignore_missing='False' it raises
+            FileNotFoundError, with 'True' it is counted in n_missing and
+            does not change the statistics.
+
+        Returns
+        -------
+        self
+        """
+        if day_array is None:
+            if _missing_not_allowed(self.ignore_missing):
+                raise FileNotFoundError(
+                    "Missing day. Set ignore_missing=True to skip missing dates."
+                )
+            self.n_missing += 1
+            return self
+
+        x = np.asarray(np.ma.filled(day_array, np.nan))
+        if self.shape is None:
+            self.shape = x.shape
+            self.dtype = _float_dtype(x)
+            self._start()
+        elif x.shape != self.shape:
+            raise ValueError("Expected a day of shape %s, got %s." % (self.shape, x.shape))
+
+        valid = np.isfinite(x)
+        self._update(np.where(valid, x, 0), valid)
+        self.n_days += 1
+        return self
+
+    def _check_started(self):
+        if self.shape is None:
+            raise ValueError("No data: call update() with at least one day first.")
+
+    def save(self, fname):
+        """Save the statistics to a .npz file, to be read with load."""
+        self._check_started()
+        state = {name: getattr(self, name) for name in self._state}
+        np.savez(fname, kind=np.array(type(self).__name__),
+                 ignore_missing=np.array(self.ignore_missing),
+                 shape=np.array(self.shape), dtype=np.array(str(self.dtype)),
+                 n_days=np.array(self.n_days), n_missing=np.array(self.n_missing),
+                 **state)
+
+    @classmethod
+    def load(cls, fname):
+        """Read statistics saved with save."""
+        with np.load(fname) as f:
+            if str(f['kind']) != cls.__name__:
+                raise ValueError("%s contains a %s, not a %s." % (fname, f['kind'], cls.__name__))
+            obj = cls.__new__(cls)
+            obj.ignore_missing = str(f['ignore_missing'])
+            obj.shape = tuple(int(n) for n in f['shape'])
+            obj.dtype = np.dtype(str(f['dtype']))
+            obj.n_days = int(f['n_days'])
+            obj.n_missing = int(f['n_missing'])
+            for name in cls._state:
+                value = f[name]
+                setattr(obj, name, value.item() if value.ndim == 0 else value)
+        return obj
+
+
+class RunningMean(_RunningStatistic):
+    """
+    Running mean of each grid point, ignoring NaN.
+
+    Parameters
+    ----------
+    ignore_missing : str, optional
+        If 'False' (default), update(None) raises FileNotFoundError.
+        If 'True', missing days are skipped.
+
+    Attributes
+    ----------
+    count : np.ndarray
+        Number of valid values of each grid point.
+    total : np.ndarray
+        Sum of the valid values (float64).
+    """
+
+    _state = ('count', 'total')
+
+    def _start(self):
+        self.count = np.zeros(self.shape, dtype=np.int64)
+        self.total = np.zeros(self.shape, dtype=np.float64)
+
+    def _update(self, x, valid):
+        self.count += valid
+        self.total += x
+
+    def result(self):
+        """Return the mean of each grid point, NaN where there is no valid value."""
+        self._check_started()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out = self.total / self.count
+        out[self.count == 0] = np.nan
+        return out.astype(self.dtype, copy=False)
+
+
+class RunningVariance(_RunningStatistic):
+    """
+    Running mean and variance of each grid point with Welford's algorithm, ignoring NaN.
+
+    Welford's update is numerically stable over long records, unlike
+    accumulating the sum of squares.
+
+    Parameters
+    ----------
+    ddof : int, optional
+        Delta degrees of freedom of the variance. Default 0, like np.nanvar.
+    ignore_missing : str, optional
+        If 'False' (default), update(None) raises FileNotFoundError.
+        If 'True', missing days are skipped.
+
+    Attributes
+    ----------
+    count : np.ndarray
+        Number of valid values of each grid point.
+    mean : np.ndarray
+        Running mean (float64, 0 where count is 0).
+    m2 : np.ndarray
+        Sum of squared deviations from the mean (float64).
+    """
+
+    _state = ('ddof', 'count', 'mean', 'm2')
+
+    def __init__(self, ddof=0, ignore_missing='False'):
+        super().__init__(ignore_missing)
+        self.ddof = int(ddof)
+
+    def _start(self):
+        self.count = np.zeros(self.shape, dtype=np.int64)
+        self.mean = np.zeros(self.shape, dtype=np.float64)
+        self.m2 = np.zeros(self.shape, dtype=np.float64)
+
+    def _update(self, x, valid):
+        _welford_update(self.count, self.mean, self.m2, x, valid)
+
+    def result(self):
+        """
+        Return (mean, variance) of each grid point.
+
+        The mean is NaN where there is no valid value, the variance where count <= ddof.
+        """
+        self._check_started()
+        mean = np.where(self.count > 0, self.mean, np.nan)
+        var = _variance(self.count, self.m2, self.ddof)
+        return mean.astype(self.dtype, copy=False), var.astype(self.dtype, copy=False)
+
+    def std(self):
+        """Return the standard deviation of each grid point."""
+        return np.sqrt(self.result()[1])
+
+
+class RunningMinMax(_RunningStatistic):
+    """
+    Running minimum and maximum of each grid point, ignoring NaN.
+
+    Parameters
+    ----------
+    ignore_missing : str, optional
+        If 'False' (default), update(None) raises FileNotFoundError.
+        If 'True', missing days are skipped.
+    """
+
+    _state = ('min', 'max')
+
+    def _start(self):
+        self.min = np.full(self.shape, np.nan, dtype=self.dtype)
+        self.max = np.full(self.shape, np.nan, dtype=self.dtype)
+
+    def _update(self, x, valid):
+        # np.fmin/np.fmax ignore NaN, so invalid points keep their value
+        x = np.where(valid, x, np.nan)
+        np.fmin(self.min, x, out=self.min)
+        np.fmax(self.max, x, out=self.max)
+
+    def result(self):
+        """Return (min, max) of each grid point, NaN where there is no valid value."""
+        self._check_started()
+        return self.min.copy(), self.max.copy()
+
+
+class RunningHistogram(_RunningStatistic):
+    """
+    Running histogram of the valid values, over all grid points or for each grid point.
+
+    The bin edges are fixed in advance, since the range of the data is not
+    known before all days are read. As in np.histogram, the last bin includes
+    its right edge, and values outside the edges are not counted (see n_outside).
+
+    Parameters
+    ----------
+    bins : int or array_like
+        Number of equal-width bins in `range`, or the bin edges.
+    range : (float, float), optional
+        Lower and upper edges. Required if `bins` is an int.
+    per_point : bool, optional
+        If False (default), one histogram of all grid points.
+        If True, one histogram for each grid point, with shape (..., n_bins).
+    ignore_missing : str, optional
+        If 'False' (default), update(None) raises FileNotFoundError.
+        If 'True', missing days are skipped.
+
+    Attributes
+    ----------
+    edges : np.ndarray
+        Bin edges (n_bins + 1).
+    counts : np.ndarray
+        Counts of each bin, (n_bins,) or (..., n_bins) (int32 per grid point).
+    n_outside : np.ndarray
+        Number of valid values outside the edges.
+    """
+
+    _state = ('edges', 'per_point', 'counts', 'n_outside')
+
+    def __init__(self, bins, range=None, per_point=False, ignore_missing='False'):
+        super().__init__(ignore_missing)
+        if np.ndim(bins) == 0:
+            if range is None:
+                raise ValueError("range is required with an integer number of bins.")
+            edges = np.linspace(float(range[0]), float(range[1]), int(bins) + 1)
+        else:
+            edges = np.asarray(bins, dtype=float)
+        if edges.ndim != 1 or edges.size < 2 or np.any(np.diff(edges) <= 0):
+            raise ValueError("bins must be increasing edges (at least 2).")
+        self.edges = edges
+        self.per_point = bool(per_point)
+
+    def _start(self):
+        n_bins = self.edges.size - 1
+        if self.per_point:
+            # At most one value per day in each bin of a grid point
+            self.counts = np.zeros(self.shape + (n_bins,), dtype=np.int32)
+        else:
+            self.counts = np.zeros((n_bins,), dtype=np.int64)
+        self.n_outside = np.zeros(self.shape if self.per_point else (), dtype=np.int64)
+
+    def _update(self, x, valid):
+        n_bins = self.edges.size - 1
+        # Bin of each value, the last bin including its right edge
+        index = np.searchsorted(self.edges, x, side='right') - 1
+        index[x == self.edges[-1]] = n_bins - 1
+        inside = valid & (index >= 0) & (index < n_bins)
+        if self.per_point:
+            self.n_outside += valid & ~inside
+            # One value per grid point, so the (point, bin) pairs are all different
+            counts = self.counts.reshape(-1, n_bins)
+            points = np.flatnonzero(inside)
+            counts[points, index.ravel()[points]] += 1
+        else:
+            self.n_outside += np.count_nonzero(valid & ~inside)
+            self.counts += np.bincount(index[inside], minlength=n_bins)
+
+    def result(self):
+        """Return (counts, edges)."""
+        self._check_started()
+        return self.counts.copy(), self.edges.copy()
+
+    def quantile(self, q):
+        """
+        Approximate quantiles from the histogram.
+
+        The values are assumed uniform inside each bin. The error is about one
+        bin width, or the gap between the two values around the quantile if
+        the bins are finer than the data. Values outside the edges are not
+        taken into account.
+
+        The grid points are processed by tiles of 2**22 counts, so besides the
+        counts and the output the work memory is about 20 MB, whatever the
+        size of the grid.
+
+        Parameters
+        ----------
+        q : float or array_like
+            Quantiles in [0, 1].
+
+        Returns
+        -------
+        np.ndarray
+            Quantiles with shape q.shape + the shape of a day (per_point=True)
+            or q.shape (per_point=False). NaN where there is no value.
+        """
+        self._check_started()
+        q = np.asarray(q, dtype=float)
+        if np.any((q < 0) | (q > 1)):
+            raise ValueError("Quantiles must be in the range [0, 1].")
+        n_bins = self.edges.size - 1
+        counts = self.counts.reshape(-1, n_bins)
+        out = np.empty((q.size, counts.shape[0]), dtype=float)
+
+        # Grid points are processed in tiles, so the cumulative counts (same
+        # dtype as the counts) and the bin search need about _QUANTILE_TILE
+        # counts of work memory instead of copies of the full histogram
+        n_tile = max(1, _QUANTILE_TILE // n_bins)
+        for p0 in range(0, counts.shape[0], n_tile):
+            tile = counts[p0:p0 + n_tile]
+            cum = np.cumsum(tile, axis=-1, dtype=tile.dtype)
+            total = cum[:, -1]
+
+            for i, qi in enumerate(q.ravel()):
+                # Value k (0-based) of the sorted data covers the counts [k, k + 1),
+                # so position q * (n - 1) of np.quantile is at count q * (n - 1) + 0.5
+                target = qi * np.maximum(total - 1, 0) + 0.5
+                # First bin where the cumulative count reaches the target
+                b = np.minimum((cum < target[:, np.newaxis]).sum(axis=-1), n_bins - 1)
+                in_bin = np.take_along_axis(tile, b[:, np.newaxis], axis=-1)[:, 0]
+                below = np.take_along_axis(cum, b[:, np.newaxis], axis=-1)[:, 0] - in_bin
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    frac = np.clip((target - below) / in_bin, 0.0, 1.0)
+                frac = np.where(in_bin > 0, frac, 0.0)
+                value = self.edges[b] + frac * (self.edges[b + 1] - self.edges[b])
+                out[i, p0:p0 + n_tile] = np.where(total > 0, value, np.nan)
+
+        out = out.reshape(q.shape + self.counts.shape[:-1])
+        return out.astype(self.dtype, copy=False)
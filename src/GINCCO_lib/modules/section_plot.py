@@ -1,9 +1,11 @@
+import warnings
+
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.colors as mcolors
 from matplotlib.colors import BoundaryNorm
 
-from GINCCO_lib.modules.import_daily import section_extract, _data_interp
+from GINCCO_lib.modules.import_daily import section_extract, _data_interp, _section_line
 
 
 def _safe_float(value):
@@ -92,37 +94,35 @@ def _smooth_local_1d(values, method, window=5, sigma=1.0):
     before = window // 2
     after = window - before - 1
 
-    if method in ("median", "moving_average"):
-        for i in range(values.size):
-            lo = max(0, i - before)
-            hi = min(values.size, i + after + 1)
-            local = values[lo:hi]
-            local = local[np.isfinite(local)]
-            if local.size == 0:
-                continue
-            if method == "median":
-                out[i] = np.nanmedian(local)
-            else:
-                out[i] = np.nanmean(local)
-        return out
-
-    sigma = float(sigma or 1.0)
-    sigma = max(sigma, 1e-6)
-    radius = max(1, int(np.ceil(3.0 * sigma)))
-    offsets = np.arange(-radius, radius + 1, dtype=float)
-    weights = np.exp(-0.5 * (offsets / sigma) ** 2)
-
-    for i in range(values.size):
-        lo = max(0, i - radius)
-        hi = min(values.size, i + radius + 1)
-        w_lo = radius - (i - lo)
-        w_hi = w_lo + (hi - lo)
-        local = values[lo:hi]
-        local_weights = weights[w_lo:w_hi]
-        valid = np.isfinite(local)
-        if not np.any(valid):
-            continue
-        out[i] = np.sum(local[valid] * local_weights[valid]) / np.sum(local_weights[valid])
+    finite = np.isfinite(values)
+    if method == "median":
+        # Windows [i - before, i + after], cut at the ends by the NaN padding
+        padded = np.pad(values, (before, after), mode="constant", constant_values=np.nan)
+        step = padded.strides[0]
+        windows = np.lib.stride_tricks.as_strided(
+            padded, shape=(values.size, window), strides=(step, step), writeable=False
+        )
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            return np.nanmedian(windows, axis=1)
+
+    if method == "moving_average":
+        weights = np.ones(window)
+        shift = after
+    else:
+        sigma = float(sigma or 1.0)
+        sigma = max(sigma, 1e-6)
+        radius = max(1, int(np.ceil(3.0 * sigma)))
+        offsets = np.arange(-radius, radius + 1, dtype=float)
+        weights = np.exp(-0.5 * (offsets / sigma) ** 2)
+        shift = radius
+
+    # NaN-aware weighted mean: convolve the values and the weights of the
+    # valid points, then normalize by the sum of the valid weights
+    total = np.convolve(np.where(finite, values, 0.0), weights)[shift:shift + values.size]
+    weight_sum = np.convolve(finite.astype(float), weights)[shift:shift + values.size]
+    valid = weight_sum > 0
+    out[valid] = total[valid] / weight_sum[valid]
     return out
 
 
@@ -133,23 +133,22 @@ def _apply_bottom_smoothing_mask(data_draw, depth_section, method="none", window
 
     data_out = np.asarray(data_draw, dtype=float).copy()
     depth_abs = np.abs(np.asarray(depth_section, dtype=float))
-    if data_out.shape != depth_abs.shape:
-        raise ValueError("data_draw and depth_section must have the same shape.")
+    if depth_abs.ndim == 1:
+        # Depth axis shared by all the columns
+        depth_abs = depth_abs[:, np.newaxis]
+    if depth_abs.shape[0] != data_out.shape[0] or depth_abs.shape[1] not in (1, data_out.shape[1]):
+        raise ValueError("depth_section must be the depth axis of data_draw, or have the same shape.")
 
-    n_depth, n_points = data_out.shape
-    raw_bottom = np.full(n_points, np.nan, dtype=float)
-    for m in range(n_points):
-        valid = np.isfinite(data_out[:, m]) & np.isfinite(depth_abs[:, m])
-        if np.any(valid):
-            raw_bottom[m] = np.nanmax(depth_abs[valid, m])
+    # Deepest valid point of each column
+    valid = np.isfinite(data_out) & np.isfinite(depth_abs)
+    raw_bottom = np.where(valid, depth_abs, -np.inf).max(axis=0)
+    raw_bottom[~valid.any(axis=0)] = np.nan
 
     smooth_bottom = _smooth_local_1d(raw_bottom, method, window=window, sigma=sigma)
 
-    for m in range(n_points):
-        if not np.isfinite(raw_bottom[m]) or not np.isfinite(smooth_bottom[m]):
-            continue
-        bottom_limit = min(raw_bottom[m], smooth_bottom[m])
-        data_out[depth_abs[:, m] > bottom_limit, m] = np.nan
+    # Mask everything below the smoothed bottom (NaN limits leave the column unchanged)
+    bottom_limit = np.minimum(raw_bottom, smooth_bottom)
+    data_out[depth_abs > bottom_limit] = np.nan
 
     return data_out
 
@@ -159,25 +158,18 @@ def extract_section(lon_data, lat_data, depth_data, lon_min, lon_max, lat_min, l
 
     Returns
     -------
-    depth_out, data_out : ndarray
-        Arrays with shape (nz_out, M).
+    depth_out : ndarray
+        Regular depth axis with shape (nz_out,). For single-level data, the
+        depth of the transect points with shape (1, M).
+    data_out : ndarray
+        Array with shape (nz_out, M).
     """
     method = _normalize_method(method)
     M = int(M)
     if M < 2:
         raise ValueError("M must be >= 2 for a section.")
 
-    if lon_min == lon_max:
-        if lat_min == lat_max:
-            raise ValueError("lon_min = lon_max and lat_min = lat_max. Not a section.")
-        lon_sec = np.full(M, lon_max)
-        lat_sec = np.linspace(lat_min, lat_max, M)
-    elif lat_min == lat_max:
-        lat_sec = np.full(M, lat_max)
-        lon_sec = np.linspace(lon_min, lon_max, M)
-    else:
-        lat_sec = np.linspace(lat_min, lat_max, M)
-        lon_sec = np.linspace(lon_min, lon_max, M)
+    lat_sec, lon_sec = _section_line(lon_min, lon_max, lat_min, lat_max, M)
 
     depth_sec, apply_interp = section_extract(lat_data, lon_data, depth_data, lat_sec, lon_sec, method=method)
     data_interpolation = apply_interp(data)
@@ -296,7 +288,7 @@ def draw_section_figure(
 
     n_depth, n_M = data_draw.shape
     x_axis = np.arange(n_M)
-    z_axis = depth_section[:, 0]
+    z_axis = depth_section if depth_section.ndim == 1 else depth_section[:, 0]
     x_mesh, z_mesh = np.meshgrid(x_axis, z_axis)
 
     ax.set_title(title)
@@ -1,8 +1,153 @@
 import numpy as np
+from scipy import sparse
+
+from GINCCO_lib.modules.grid import _as_grid
+from GINCCO_lib.modules.helpers import _float_dtype, _is_in_memory, _time_chunks
+
+
+class Region:
+    """
+    Reusable area weights of a region, for area-weighted spatial means.
+
+    The geographic box, the ocean mask and the valid grid-cell weights are
+    combined once into a compact weight vector over the points of the region.
+    The same Region can then average any number of fields (e.g. several
+    variables or several runs on the same grid) without building the masks
+    again.
+
+    Parameters
+    ----------
+    dxdy : np.ndarray, optional
+        Grid-cell weights or areas [Y, X]. Taken from `grid` (dxdy_t) if not given.
+    mask_ocean : np.ndarray, optional
+        Ocean mask where valid (ocean) cells are 1 and land cells are 0.
+        Must match spatial shape [Y, X]. Only points with mask == 1 are used.
+    lon_t, lat_t : np.ndarray, optional
+        Longitudes and latitudes of grid. Required if lon/lat bounds are used.
+    lon_min, lon_max, lat_min, lat_max : float, optional
+        Geographic subset boundaries.
+    grid : Grid or str, optional
+        Grid of the run, from open_grid(path). Used for `dxdy`, `lon_t` and
+        `lat_t` (on the T grid) when they are not given.
+
+    Examples
+    --------
+    >>> box = Region(dxdy_t, mask_ocean=mask_t, lon_t=lon_t, lat_t=lat_t,
+    ...              lon_min=106, lon_max=107, lat_min=20, lat_max=21)
+    >>> sal_mean = box.mean(sal_surface)          # [T]
+    >>> tem_mean = spatial_average(tem_surface, region=box)
+    """
+
+    def __init__(self, dxdy=None, mask_ocean=None, lon_t=None, lat_t=None,
+                 lon_min=None, lon_max=None, lat_min=None, lat_max=None, grid=None):
+        if grid is not None:
+            grid = _as_grid(grid, None)
+            dxdy = grid['dxdy_t'] if dxdy is None else dxdy
+            lon_t = grid['longitude_t'] if lon_t is None else lon_t
+            lat_t = grid['latitude_t'] if lat_t is None else lat_t
+        if dxdy is None:
+            raise ValueError("`dxdy` (or `grid`) is required.")
+        dxdy = np.asarray(np.ma.filled(dxdy, np.nan), dtype=float)
+        if dxdy.ndim != 2:
+            raise ValueError("`dxdy` must be 2D [Y, X].")
+        self.shape = dxdy.shape
+
+        # --- Geographic mask ---
+        region_mask = np.isfinite(dxdy) & (dxdy > 0)
+        if any(v is not None for v in (lon_min, lon_max, lat_min, lat_max)):
+            if lon_t is None or lat_t is None:
+                raise ValueError("lon_t and lat_t are required when specifying geographic bounds.")
+
+            lon_t = np.asarray(lon_t)
+            lat_t = np.asarray(lat_t)
+            if lon_t.ndim == 1 and lat_t.ndim == 1:
+                print ('Be careful. Shape of lon and lat are 1D. ')
+                LON, LAT = np.meshgrid(lon_t, lat_t)
+            else:
+                LON, LAT = lon_t, lat_t
+
+            if lon_min is not None:
+                region_mask &= (LON >= lon_min)
+            if lon_max is not None:
+                region_mask &= (LON <= lon_max)
+            if lat_min is not None:
+                region_mask &= (LAT >= lat_min)
+            if lat_max is not None:
+                region_mask &= (LAT <= lat_max)
+
+        # --- Ocean mask ---
+        if mask_ocean is not None:
+            mask_ocean = np.asarray(mask_ocean)
+            if mask_ocean.shape != self.shape:
+                raise ValueError(f"`mask_ocean` shape {mask_ocean.shape} must match {self.shape}.")
+            region_mask &= (mask_ocean == 1)
+
+        # Compact weights: flat indices of the points of the region and their weights
+        self.index = np.flatnonzero(region_mask)
+        self.weights = dxdy.ravel()[self.index]
+
+    def __repr__(self):
+        return 'Region(shape=%s, n_points=%d)' % (self.shape, self.index.size)
+
+    @property
+    def mask(self):
+        """2D boolean mask [Y, X] of the points used by the region."""
+        mask = np.zeros(self.shape, dtype=bool)
+        mask.flat[self.index] = True
+        return mask
+
+    def _reduce(self, block, weights):
+        """Weighted means [T] of a block [T, Y, X], ignoring NaNs, with one product over the flattened space."""
+        values = block.reshape(block.shape[0], -1)[:, self.index]
+        valid = np.isfinite(values)
+        values[~valid] = 0
+        num = values @ weights
+        den = valid.astype(weights.dtype) @ weights
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = num / den
+        mean[~(den > 0)] = np.nan
+        return mean
+
+    def mean(self, data, chunk_days=31):
+        """
+        Area-weighted mean of `data` over the region.
+
+        Parameters
+        ----------
+        data : np.ndarray or array-like
+            2-D array [Y, X] or 3-D array [T, Y, X]. NaNs are ignored. On-disk
+            3-D arrays (np.memmap, netCDF variable) are read chunk by chunk.
+        chunk_days : int, optional
+            Number of time steps reduced at once, to bound the temporary arrays.
+
+        Returns
+        -------
+        np.ndarray or float
+            Weighted spatial mean. If `data` is 2D → scalar; if 3D → 1D array [T].
+            Float32 input stays float32.
+        """
+        if _is_in_memory(data) or not hasattr(data, 'shape'):
+            data = np.asarray(data)
+        if len(data.shape) not in (2, 3):
+            raise ValueError("`data` must be 2D [Y, X] or 3D [T, Y, X].")
+        if tuple(data.shape[-2:]) != self.shape:
+            raise ValueError(f"`dxdy` shape {self.shape} must match spatial shape {tuple(data.shape[-2:])}.")
+
+        # Keep float32 data in float32 (weights are cast once, not the data)
+        weights = self.weights.astype(_float_dtype(data), copy=False)
+
+        if len(data.shape) == 2:
+            return self._reduce(np.asarray(np.ma.filled(data[:], np.nan))[None], weights)[0]
+
+        out = np.full(data.shape[0], np.nan, dtype=weights.dtype)
+        for t0, block in _time_chunks(data, chunk_days):
+            out[t0:t0 + block.shape[0]] = self._reduce(block, weights)
+        return out
+
 
 def spatial_average(
     data,
-    dxdy,
+    dxdy=None,
     mask_ocean=None,
     lon_t=None,
     lat_t=None,
@@ -10,7 +155,9 @@ def spatial_average(
     lon_max=None,
     lat_min=None,
     lat_max=None,
-    
+    chunk_days=31,
+    grid=None,
+    region=None,
 ):
     """
     Compute an area-weighted spatial mean on a possibly non-regular grid,
@@ -19,11 +166,13 @@ def spatial_average(
 
     Parameters
     ----------
-    data : np.ndarray
+    data : np.ndarray or array-like
         2-D array [Y, X] or 3-D array [T, Y, X] containing the field to average.
-        NaNs are ignored.
-    dxdy : np.ndarray
+        NaNs are ignored. On-disk 3-D arrays (np.memmap, netCDF variable, e.g.
+        from import_4D(..., out=...)) are read chunk by chunk over time.
+    dxdy : np.ndarray, optional
         Grid-cell weights or areas. Must match or broadcast to spatial shape [Y, X].
+        Taken from `grid` (dxdy_t) if not given.
     mask_ocean : np.ndarray, optional
         Ocean mask where valid (ocean) cells are 1 and land cells are 0.
         Must match spatial shape [Y, X]. Only points with mask == 1 are used.
@@ -33,64 +182,134 @@ def spatial_average(
         Latitudes of grid. Required if lon/lat bounds are used.
     lon_min, lon_max, lat_min, lat_max : float, optional
         Geographic subset boundaries.
+    chunk_days : int, optional
+        Number of time steps reduced at once (and read at once for on-disk arrays).
+    grid : Grid or str, optional
+        Grid of the run, from open_grid(path). Used for `dxdy`, `lon_t` and
+        `lat_t` (on the T grid) when they are not given.
+    region : Region, optional
+        Precomputed Region. If given, dxdy, mask_ocean, lon_t, lat_t, the
+        bounds and grid are ignored and the region weights are reused.
 
     Returns
     -------
     np.ndarray or float
         Weighted spatial mean. If `data` is 2D → scalar; if 3D → 1D array [T].
+        Float32 input stays float32.
     """
-    data = np.asarray(data)
-    dxdy = np.asarray(dxdy)
+    if region is None:
+        region = Region(dxdy, mask_ocean=mask_ocean, lon_t=lon_t, lat_t=lat_t,
+                        lon_min=lon_min, lon_max=lon_max, lat_min=lat_min, lat_max=lat_max, grid=grid)
+    return region.mean(data, chunk_days=chunk_days)
 
-    if data.ndim not in (2, 3):
-        raise ValueError("`data` must be 2D [Y, X] or 3D [T, Y, X].")
 
-    spatial_shape = data.shape[-2:]
-
-    if dxdy.shape != spatial_shape:
-        raise ValueError(f"`dxdy` shape {dxdy.shape} must match spatial shape {spatial_shape}.")
-
-    # --- Geographic mask ---
-    region_mask = np.ones(spatial_shape, dtype=bool)
-    if any(v is not None for v in (lon_min, lon_max, lat_min, lat_max)):
-        if lon_t is None or lat_t is None:
-            raise ValueError("lon_t and lat_t are required when specifying geographic bounds.")
-
-        lon_t = np.asarray(lon_t)
-        lat_t = np.asarray(lat_t)
-        if lon_t.ndim == 1 and lat_t.ndim == 1:
-            print ('Be careful. Shape of lon and lat are 1D. ')
-            LON, LAT = np.meshgrid(lon_t, lat_t)
-        else:
-            LON, LAT = lon_t, lat_t
-
-        if lon_min is not None:
-            region_mask &= (LON >= lon_min)
-        if lon_max is not None:
-            region_mask &= (LON <= lon_max)
-        if lat_min is not None:
-            region_mask &= (LAT >= lat_min)
-        if lat_max is not None:
-            region_mask &= (LAT <= lat_max)
-
-    # --- Ocean mask ---
-    if mask_ocean is not None:
-        mask_ocean = np.asarray(mask_ocean)
-        if mask_ocean.shape != spatial_shape:
-            raise ValueError(f"`mask_ocean` shape {mask_ocean.shape} must match {spatial_shape}.")
-        region_mask &= (mask_ocean == 1)
-
-    # --- Perform averaging ---
-    def _weighted_mean(field):
-        valid_mask = np.isfinite(field) & np.isfinite(dxdy) & (dxdy > 0) & region_mask
-        num = np.nansum(field[valid_mask] * dxdy[valid_mask])
-        den = np.nansum(dxdy[valid_mask])
-        return num / den if den > 0 else np.nan
-
-    if data.ndim == 2:
-        return _weighted_mean(data)
+def _region_matrix(regions, dxdy=None, mask_ocean=None, lon_t=None, lat_t=None, grid=None):
+    """Return the sparse [n_region, Y*X] weight matrix of a list of Region/boxes or of an integer label raster."""
+    if isinstance(regions, np.ndarray) and np.issubdtype(regions.dtype, np.integer):
+        # Label raster: one region per label, points with a negative label are not used
+        base = Region(dxdy, mask_ocean=mask_ocean, grid=grid)
+        if regions.shape != base.shape:
+            raise ValueError(f"`regions` shape {regions.shape} must match {base.shape}.")
+        labels = regions.ravel()[base.index]
+        used = labels >= 0
+        n_region = int(regions.max()) + 1 if regions.size else 0
+        rows, cols, weights = labels[used], base.index[used], base.weights[used]
+        shape = base.shape
     else:
-        out = np.full(data.shape[0], np.nan)
-        for t in range(data.shape[0]):
-            out[t] = _weighted_mean(data[t])
-        return out
+        # List of Region objects or of (lon_min, lon_max, lat_min, lat_max) boxes
+        regions = [r if isinstance(r, Region) else
+                   Region(dxdy, mask_ocean=mask_ocean, lon_t=lon_t, lat_t=lat_t,
+                          lon_min=r[0], lon_max=r[1], lat_min=r[2], lat_max=r[3], grid=grid)
+                   for r in regions]
+        if not regions:
+            raise ValueError("`regions` must contain at least one region.")
+        shape = regions[0].shape
+        if any(r.shape != shape for r in regions):
+            raise ValueError("All the regions must have the same spatial shape.")
+        n_region = len(regions)
+        rows = np.concatenate([np.full(r.index.size, k) for k, r in enumerate(regions)])
+        cols = np.concatenate([r.index for r in regions])
+        weights = np.concatenate([r.weights for r in regions])
+    matrix = sparse.csr_matrix((weights, (rows, cols)), shape=(n_region, shape[0] * shape[1]))
+    return matrix, shape
+
+
+def spatial_average_regions(data, dxdy=None, regions=None, mask_ocean=None, lon_t=None, lat_t=None,
+                            chunk_days=31, grid=None):
+    """
+    Compute the area-weighted spatial means of many regions in one pass over the data.
+
+    Each time chunk of `data` is read once, and the weighted sums of all the
+    regions are computed with one sparse weight matrix [n_region, Y*X] (a
+    weighted label reduction, like np.bincount, which also allows overlapping
+    boxes).
+
+    Parameters
+    ----------
+    data : np.ndarray or array-like
+        2-D array [Y, X] or 3-D array [T, Y, X]. NaNs are ignored. On-disk
+        3-D arrays (np.memmap, netCDF variable) are read chunk by chunk.
+    dxdy : np.ndarray, optional
+        Grid-cell weights or areas [Y, X]. Taken from `grid` (dxdy_t) if not given.
+    regions : list or np.ndarray of int
+        Either a list of regions, each a Region or a box
+        (lon_min, lon_max, lat_min, lat_max), or an integer label raster
+        [Y, X] where the points with label k belong to region k (negative
+        labels are not used, n_region = max label + 1).
+    mask_ocean : np.ndarray, optional
+        Ocean mask where valid (ocean) cells are 1 and land cells are 0.
+        Not used for regions given as Region objects.
+    lon_t, lat_t : np.ndarray, optional
+        Longitudes and latitudes of grid. Required for boxes.
+    chunk_days : int, optional
+        Number of time steps reduced at once (and read at once for on-disk arrays).
+    grid : Grid or str, optional
+        Grid of the run, from open_grid(path). Used for `dxdy`, `lon_t` and
+        `lat_t` (on the T grid) when they are not given.
+
+    Returns
+    -------
+    np.ndarray
+        Weighted spatial means [n_region, T] (or [n_region] if `data` is 2D).
+        Regions without valid points are NaN. Float32 input stays float32.
+
+    Examples
+    --------
+    >>> boxes = [(106, 107, 20, 21), (107.1, 108.1, 20, 21)]
+    >>> sal_mean = spatial_average_regions(sal_surface, dxdy_t, boxes, mask_ocean=mask_t,
+    ...                                    lon_t=lon_t, lat_t=lat_t)    # [2, T]
+    """
+    if regions is None:
+        raise ValueError("`regions` is required.")
+    matrix, shape = _region_matrix(regions, dxdy, mask_ocean, lon_t, lat_t, grid)
+
+    if _is_in_memory(data) or not hasattr(data, 'shape'):
+        data = np.asarray(data)
+    if len(data.shape) not in (2, 3):
+        raise ValueError("`data` must be 2D [Y, X] or 3D [T, Y, X].")
+    if tuple(data.shape[-2:]) != shape:
+        raise ValueError(f"`dxdy` shape {shape} must match spatial shape {tuple(data.shape[-2:])}.")
+    out_dtype = _float_dtype(data)
+
+    # Only the points used by at least one region are read from each chunk
+    cols = np.unique(matrix.indices)
+    matrix = matrix[:, cols]
+
+    def _reduce(block):
+        values = block.reshape(block.shape[0], -1)[:, cols]
+        valid = np.isfinite(values)
+        values[~valid] = 0
+        num = matrix @ values.T
+        den = matrix @ valid.T.astype(float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = num / den
+        mean[~(den > 0)] = np.nan
+        return mean.astype(out_dtype, copy=False)
+
+    if len(data.shape) == 2:
+        return _reduce(np.asarray(np.ma.filled(data[:], np.nan))[None])[:, 0]
+
+    out = np.full((matrix.shape[0], data.shape[0]), np.nan, dtype=out_dtype)
+    for t0, block in _time_chunks(data, chunk_days):
+        out[:, t0:t0 + block.shape[0]] = _reduce(block)
+    return out
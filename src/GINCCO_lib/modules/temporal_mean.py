@@ -1,66 +1,197 @@
 import numpy as np
 from datetime import datetime
 
+from GINCCO_lib.modules.helpers import _float_dtype, _time_chunks
+
 def _to_np_day(d: datetime) -> np.datetime64:
     """Convert Python datetime to numpy datetime64 at day resolution."""
     return np.datetime64(d.date(), 'D')
 
-def monthly_mean(data: np.ndarray, tstart: datetime, tend: datetime, time_axis: int = 0):
+def _check_days(data, tstart: datetime, tend: datetime, time_axis: int) -> np.ndarray:
+    """Return the daily timestamps of [tstart, tend], checking them against the time axis of data."""
+    start_d = _to_np_day(tstart)
+    end_d   = _to_np_day(tend)
+
+    # Expected number of days (inclusive)
+    n_days = int((end_d - start_d) / np.timedelta64(1, 'D')) + 1
+    if data.shape[time_axis] != n_days:
+        raise ValueError(f"Expected {n_days} days from {tstart.date()} to {tend.date()}, got {data.shape[time_axis]}.")
+
+    return start_d + np.arange(n_days).astype('timedelta64[D]')
+
+def _period_keys(time_vec: np.ndarray, freq):
     """
-    Compute monthly means for daily, contiguous data in [tstart, tend] (inclusive).
+    Return (keys, to_label) for a resampling frequency.
+
+    keys[t] is a non-decreasing integer period of day t, and to_label converts
+    keys to the datetime64 label (first day/month/year) of each period.
+    """
+    name = str(freq).strip().upper()
+    if name in ('M', 'MONTH', 'MONTHLY'):
+        keys = time_vec.astype('datetime64[M]').astype(np.int64)
+        return keys, lambda k: k.astype('datetime64[M]')
+    if name in ('Y', 'A', 'YEAR', 'ANNUAL'):
+        keys = time_vec.astype('datetime64[Y]').astype(np.int64)
+        return keys, lambda k: k.astype('datetime64[Y]')
+    if name in ('S', 'Q', 'SEASON', 'SEASONAL'):
+        # DJF, MAM, JJA, SON: shift December into the winter of the next year
+        months = time_vec.astype('datetime64[M]').astype(np.int64)
+        keys = (months + 1) // 3
+        return keys, lambda k: (3 * k - 1).astype('datetime64[M]')
+    if name in ('W', 'WEEK', 'WEEKLY'):
+        # Weeks start on Monday (1970-01-01 is a Thursday)
+        keys = (time_vec.astype('datetime64[D]').astype(np.int64) + 3) // 7
+        return keys, lambda k: (7 * k - 3).astype('datetime64[D]')
+
+    # Blocks of N days from the first day: N, 'ND' or 'N days'
+    n = name[:-1] if name.endswith('D') else name
+    try:
+        n = int(n)
+    except ValueError:
+        raise ValueError("freq must be 'W', 'M', 'S' (season), 'Y' or a number of days, got %r." % (freq,))
+    if n < 1:
+        raise ValueError("The number of days of freq must be >= 1.")
+    start = time_vec[0].astype(np.int64)
+    keys = (time_vec.astype('datetime64[D]').astype(np.int64) - start) // n
+    return keys, lambda k: (start + n * k).astype('datetime64[D]')
+
+def _segment_mean(data, groups: np.ndarray, n_groups: int, time_axis: int, chunk_days: int):
+    """
+    NaN-ignoring mean of contiguous groups of days.
+
+    groups[t] is the output index of day t. It starts at 0 and increases by 0
+    or 1 from one day to the next, so each group is one run of consecutive days
+    and is reduced with a sum over a slice instead of a boolean selection.
+    Runs cut by a chunk boundary are accumulated across chunks in float64.
+    Peak memory is one chunk plus the output.
+    """
+    total = None
+    for i0, block in _time_chunks(data, chunk_days, time_axis):
+        if total is None:
+            total = np.zeros((n_groups,) + block.shape[1:], dtype=np.float64)
+            count = np.zeros((n_groups,) + block.shape[1:], dtype=np.int32)
+            filled = np.empty(block.shape, dtype=_float_dtype(block))
+        n = block.shape[0]
+        valid = np.isfinite(block)
+        # NaN set to 0 in a reused buffer, so the input is never modified
+        np.copyto(filled[:n], block)
+        np.copyto(filled[:n], 0, where=~valid)
+
+        # Start and end of the runs of the chunk
+        block_groups = groups[i0:i0 + n]
+        starts = np.flatnonzero(np.r_[True, block_groups[1:] != block_groups[:-1]])
+        ends = np.r_[starts[1:], n]
+        for t0, t1 in zip(starts, ends):
+            g = block_groups[t0]
+            total[g] += filled[t0:t1].sum(axis=0)
+            count[g] += valid[t0:t1].sum(axis=0, dtype=np.int32)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out = total / count
+    out[count == 0] = np.nan
+    return out.astype(filled.dtype, copy=False)
+
+def resample_mean(data: np.ndarray, tstart: datetime, tend: datetime, freq='M', time_axis: int = 0, chunk_days: int = 31):
+    """
+    Compute means over consecutive periods for daily, contiguous data in [tstart, tend] (inclusive).
+
+    Each period is a run of consecutive days, so all periods are reduced in one
+    pass over the data with sums and counts of valid (non-NaN) values.
+    Partial first or last periods are averaged over the available days.
 
     Parameters
     ----------
-    data : np.ndarray
-        Input array. One axis is time (daily).
+    data : np.ndarray or array-like
+        Input array. One axis is time (daily). On-disk arrays (np.memmap,
+        netCDF variable, e.g. from import_4D(..., out=...)) are read chunk by
+        chunk over time instead of being loaded at once.
     tstart, tend : datetime.datetime
         Inclusive range of the data.
+    freq : str or int
+        Length of the periods:
+        'W' weeks (Monday to Sunday), 'M' calendar months,
+        'S' seasons (DJF, MAM, JJA, SON), 'Y' calendar years,
+        or a number of days (e.g. 5 or '5D') counted from tstart.
     time_axis : int
         Axis that represents time in `data`.
+    chunk_days : int
+        Number of days reduced at once. It bounds the temporary arrays, and
+        on-disk arrays are read with the same chunks.
 
     Returns
     -------
-    monthly : np.ndarray
-        Monthly means with time axis replaced by number of months.
-    month_labels : np.ndarray of datetime64[M]
-        Month labels for each output slice.
+    means : np.ndarray
+        Period means with time axis replaced by number of periods.
+        Float32 input stays float32.
+    labels : np.ndarray of datetime64
+        Start of each period: datetime64[D] for weeks and N days,
+        datetime64[M] for months and seasons (e.g. 2010-12 for DJF 2010/11),
+        datetime64[Y] for years.
     """
-    # Normalize time axis to front
-    x = np.moveaxis(data, time_axis, 0)
+    if not hasattr(data, 'shape'):
+        data = np.asarray(data)
 
-    start_d = _to_np_day(tstart)
-    end_d   = _to_np_day(tend)
+    time_vec = _check_days(data, tstart, tend, time_axis)
+    keys, to_label = _period_keys(time_vec, freq)
 
-    # Expected number of days (inclusive)
-    n_days = int((end_d - start_d) / np.timedelta64(1, 'D')) + 1
-    if x.shape[0] != n_days:
-        raise ValueError(f"Expected {n_days} days from {tstart.date()} to {tend.date()}, got {x.shape[0]}.")
+    # Periods are numbered from the first one, and every period in between
+    # contains at least one day
+    groups = keys - keys[0]
+    n_groups = int(groups[-1]) + 1
+    labels = to_label(keys[0] + np.arange(n_groups))
 
-    # Daily timestamps
-    time_vec = start_d + np.arange(n_days).astype('timedelta64[D]')
+    out = _segment_mean(data, groups, n_groups, time_axis, chunk_days)
 
-    # Month labels
-    y1, m1 = tstart.year, tstart.month
-    y2, m2 = tend.year, tend.month
-    n_months = (y2 - y1) * 12 + (m2 - m1) + 1
-    month0 = np.datetime64(f"{y1:04d}-{m1:02d}", 'M')
-    month_labels = month0 + np.arange(n_months).astype('timedelta64[M]')
+    # Restore original axis layout
+    return np.moveaxis(out, 0, time_axis), labels
 
-    # Map each day to its month
-    time_months = time_vec.astype('datetime64[M]')
+def weekly_mean(data: np.ndarray, tstart: datetime, tend: datetime, time_axis: int = 0, chunk_days: int = 31):
+    """
+    Compute weekly (Monday to Sunday) means for daily, contiguous data in [tstart, tend] (inclusive).
 
-    # Aggregate
-    out = np.empty((n_months,) + x.shape[1:], dtype=float)
-    for i, m in enumerate(month_labels):
-        sel = (time_months == m)
-        out[i] = np.nanmean(x[sel, ...], axis=0)
+    Partial first or last weeks are averaged over the available days.
+    See resample_mean for the parameters.
 
-    # Restore original axis layout
-    monthly = np.moveaxis(out, 0, time_axis)
-    return monthly, month_labels
+    Returns
+    -------
+    weekly : np.ndarray
+        Weekly means with time axis replaced by number of weeks.
+        Float32 input stays float32.
+    week_labels : np.ndarray of datetime64[D]
+        Monday of each output week.
+    """
+    return resample_mean(data, tstart, tend, 'W', time_axis=time_axis, chunk_days=chunk_days)
+
+def monthly_mean(data: np.ndarray, tstart: datetime, tend: datetime, time_axis: int = 0, chunk_days: int = 31):
+    """
+    Compute monthly means for daily, contiguous data in [tstart, tend] (inclusive).
+
+    Parameters
+    ----------
+    data : np.ndarray or array-like
+        Input array. One axis is time (daily). On-disk arrays (np.memmap,
+        netCDF variable, e.g. from import_4D(..., out=...)) are read chunk by
+        chunk over time instead of being loaded at once.
+    tstart, tend : datetime.datetime
+        Inclusive range of the data.
+    time_axis : int
+        Axis that represents time in `data`.
+    chunk_days : int
+        Number of days reduced at once. It bounds the temporary arrays, and
+        on-disk arrays are read with the same chunks.
+
+    Returns
+    -------
+    monthly : np.ndarray
+        Monthly means with time axis replaced by number of months.
+        Float32 input stays float32.
+    month_labels : np.ndarray of datetime64[M]
+        Month labels for each output slice.
+    """
+    return resample_mean(data, tstart, tend, 'M', time_axis=time_axis, chunk_days=chunk_days)
 
 
-def annual_mean(data: np.ndarray, tstart: datetime, tend: datetime, time_axis: int = 0):
+def annual_mean(data: np.ndarray, tstart: datetime, tend: datetime, time_axis: int = 0, chunk_days: int = 31):
     """
     Compute annual means for daily, contiguous data in [tstart, tend] (inclusive).
 
@@ -68,42 +199,286 @@ def annual_mean(data: np.ndarray, tstart: datetime, tend: datetime, time_axis: i
 
     Parameters
     ----------
-    data : np.ndarray
-        Input array. One axis is time (daily).
+    data : np.ndarray or array-like
+        Input array. One axis is time (daily). On-disk arrays (np.memmap,
+        netCDF variable, e.g. from import_4D(..., out=...)) are read chunk by
+        chunk over time instead of being loaded at once.
     tstart, tend : datetime.datetime
         Inclusive range of the data.
     time_axis : int
         Axis that represents time in `data`.
+    chunk_days : int
+        Number of days reduced at once. It bounds the temporary arrays, and
+        on-disk arrays are read with the same chunks.
 
     Returns
     -------
     yearly : np.ndarray
         Annual means with time axis replaced by number of years.
+        Float32 input stays float32.
     year_labels : np.ndarray of datetime64[Y]
         Year labels for each output slice.
     """
-    x = np.moveaxis(data, time_axis, 0)
+    return resample_mean(data, tstart, tend, 'Y', time_axis=time_axis, chunk_days=chunk_days)
 
-    start_d = _to_np_day(tstart)
-    end_d   = _to_np_day(tend)
 
-    n_days = int((end_d - start_d) / np.timedelta64(1, 'D')) + 1
-    if x.shape[0] != n_days:
-        raise ValueError(f"Expected {n_days} days from {tstart.date()} to {tend.date()}, got {x.shape[0]}.")
+def seasonal_mean(data: np.ndarray, tstart: datetime, tend: datetime, time_axis: int = 0, chunk_days: int = 31):
+    """
+    Compute seasonal (DJF, MAM, JJA, SON) means for daily, contiguous data in [tstart, tend] (inclusive).
 
-    time_vec = start_d + np.arange(n_days).astype('timedelta64[D]')
+    December belongs to the winter of the following January. Partial first or
+    last seasons are averaged over the available days.
+    See resample_mean for the parameters.
 
-    y1, y2 = tstart.year, tend.year
-    n_years = (y2 - y1) + 1
-    year0 = np.datetime64(f"{y1:04d}", 'Y')
-    year_labels = year0 + np.arange(n_years).astype('timedelta64[Y]')
+    Returns
+    -------
+    seasonal : np.ndarray
+        Seasonal means with time axis replaced by number of seasons.
+        Float32 input stays float32.
+    season_labels : np.ndarray of datetime64[M]
+        First month of each season (12, 3, 6 or 9).
+    """
+    return resample_mean(data, tstart, tend, 'S', time_axis=time_axis, chunk_days=chunk_days)
+
+
+#############################
+# Climatologies
+#############################
+
+# First day of each month in a leap-year calendar (0-based day of year)
+_LEAP_MONTH_START = np.cumsum([0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30])
+
+def _calendar_slots(time_vec: np.ndarray, n_slots: int) -> np.ndarray:
+    """
+    Calendar slot of each day: month of year (0-11) if n_slots is 12, else day
+    of year (0-365) in a leap-year calendar, so that 1 March is always slot 60.
+    """
+    months = time_vec.astype('datetime64[M]')
+    month_of_year = months.astype(np.int64) % 12
+    if n_slots == 12:
+        return month_of_year
+    day_of_month = (time_vec.astype('datetime64[D]') - months).astype(np.int64)
+    return _LEAP_MONTH_START[month_of_year] + day_of_month
+
+def _welford_merge(count, mean, m2, n_b, mean_b, m2_b):
+    """
+    Merge the statistics of a batch (n_b values, mean_b, m2_b) into running
+    statistics (count, mean, m2), with the pairwise update of Chan et al.
+
+    m2 is the sum of squared deviations from the mean. mean_b must be 0 (not
+    NaN) where n_b is 0. Returns the updated (count, mean, m2).
+    """
+    n = count + n_b
+    with np.errstate(invalid='ignore', divide='ignore'):
+        w = np.where(n > 0, n_b / np.maximum(n, 1), 0.0)
+    delta = mean_b - mean
+    mean = mean + delta * w
+    m2 = m2 + m2_b + delta * delta * count * w
+    return n, mean, m2
+
+def _welford_update(count, mean, m2, x, valid):
+    """
+    Welford update of running statistics (count, mean, m2), in place, with one
+    new value x per element. x must be 0 (not NaN) where valid is False.
+    """
+    count += valid
+    delta = x - mean
+    delta *= valid
+    mean += delta / np.maximum(count, 1)
+    m2 += delta * (x - mean)
+
+def _batch_stats(filled, valid):
+    """Return (n, mean, m2) over axis 0 of a block, with NaN set to 0 in filled."""
+    n_b = valid.sum(axis=0)
+    mean_b = filled.sum(axis=0, dtype=np.float64) / np.maximum(n_b, 1)
+    m2_b = (np.where(valid, filled - mean_b, 0.0) ** 2).sum(axis=0)
+    return n_b, mean_b, m2_b
+
+def _variance(count, m2, ddof):
+    """Variance from the running statistics, NaN where count <= ddof."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        var = m2 / (count - ddof)
+    var[count <= ddof] = np.nan
+    return var
+
+def _daily_blocks(days):
+    """Turn an iterable of (date, day_array) into (dates, block) pairs of one day."""
+    for date, day in days:
+        block = np.asarray(np.ma.filled(day, np.nan))
+        yield np.array([np.datetime64(date, 'D')]), block[np.newaxis]
+
+def _climatology(data, tstart, tend, time_axis, chunk_days, ddof, n_slots):
+    """Mean and standard deviation of each calendar slot, in one streaming pass."""
+    if hasattr(data, 'shape'):
+        time_vec = _check_days(data, tstart, tend, time_axis)
+        blocks = ((time_vec[i0:i0 + block.shape[0]], block)
+                  for i0, block in _time_chunks(data, chunk_days, time_axis))
+    else:
+        time_axis = 0
+        blocks = _daily_blocks(data)
+
+    count = None
+    for dates, block in blocks:
+        if count is None:
+            shape = (n_slots,) + block.shape[1:]
+            count = np.zeros(shape, dtype=np.int64)
+            mean = np.zeros(shape, dtype=np.float64)
+            m2 = np.zeros(shape, dtype=np.float64)
+            dtype = _float_dtype(block)
+
+        slots = _calendar_slots(dates, n_slots)
+        valid = np.isfinite(block)
+        filled = np.where(valid, block, 0)
+
+        starts = np.flatnonzero(np.r_[True, slots[1:] != slots[:-1]])
+        if len(starts) == len(slots):
+            # One day per slot (daily climatology): Welford update of the
+            # consecutive slots s0, s0 + 1, ... as slices, in place
+            breaks = np.flatnonzero(np.diff(slots) != 1) + 1
+            for t0, t1 in zip(np.r_[0, breaks], np.r_[breaks, len(slots)]):
+                g = slice(slots[t0], slots[t0] + t1 - t0)
+                _welford_update(count[g], mean[g], m2[g], filled[t0:t1], valid[t0:t1])
+        else:
+            # Runs of days of the same slot (months): merge each run
+            ends = np.r_[starts[1:], len(slots)]
+            for t0, t1 in zip(starts, ends):
+                g = slots[t0]
+                count[g], mean[g], m2[g] = _welford_merge(
+                    count[g], mean[g], m2[g], *_batch_stats(filled[t0:t1], valid[t0:t1]))
+
+    if count is None:
+        raise ValueError("No data to compute the climatology.")
+
+    mean[count == 0] = np.nan
+    std = np.sqrt(_variance(count, m2, ddof))
+    mean = np.moveaxis(mean.astype(dtype, copy=False), 0, time_axis)
+    std = np.moveaxis(std.astype(dtype, copy=False), 0, time_axis)
+    return mean, std
+
+def daily_climatology(data, tstart: datetime = None, tend: datetime = None, time_axis: int = 0,
+                      chunk_days: int = 31, ddof: int = 0):
+    """
+    Compute the mean and standard deviation of each day of the year across years.
+
+    The statistics are accumulated in a single streaming pass with Welford
+    updates, so only one chunk (or one day) of data is in memory at a time.
+    Days are placed in a leap-year calendar: 29 February has its own slot and
+    1 March is always day 61.
+
+    Parameters
+    ----------
+    data : np.ndarray, array-like or iterable
+        Daily, contiguous data in [tstart, tend] (inclusive), with one axis for
+        time. On-disk arrays (np.memmap, netCDF variable, e.g. from
+        import_4D(..., out=...)) are read chunk by chunk.
+        Or an iterable of (date, day_array) pairs, e.g. iter_days(...); the
+        days may then have gaps.
+    tstart, tend : datetime.datetime
+        Inclusive range of the data. Not used for an iterable.
+    time_axis : int
+        Axis that represents time in `data` (and day of year in the outputs).
+    chunk_days : int
+        Number of days read at once for array data.
+    ddof : int
+        Delta degrees of freedom of the standard deviation. Default 0, like np.nanstd.
+
+    Returns
+    -------
+    mean, std : np.ndarray
+        Climatological mean and standard deviation, with the time axis replaced
+        by 366 days of year. Days without valid data are NaN.
+        Float32 input stays float32.
+    day_labels : np.ndarray of int
+        Day of year (1-366) of each output slice, 60 being 29 February.
+
+    Examples
+    --------
+    >>> days = iter_days(path, 'tem', datetime(2000, 1, 1), datetime(2019, 12, 31),
+    ...                  selector=np.s_[:, -1, :, :], ignore_missing='True')
+    >>> sst_clim, sst_std, doy = daily_climatology(days)
+    """
+    mean, std = _climatology(data, tstart, tend, time_axis, chunk_days, ddof, 366)
+    return mean, std, np.arange(1, 367)
+
+def monthly_climatology(data, tstart: datetime = None, tend: datetime = None, time_axis: int = 0,
+                        chunk_days: int = 31, ddof: int = 0):
+    """
+    Compute the mean and standard deviation of each month of the year across years.
+
+    The statistics are accumulated over all days of each calendar month in a
+    single streaming pass with Welford updates. See daily_climatology for the
+    parameters.
+
+    Returns
+    -------
+    mean, std : np.ndarray
+        Climatological mean and standard deviation of the daily values, with
+        the time axis replaced by the 12 months. Float32 input stays float32.
+    month_labels : np.ndarray of int
+        Month of year (1-12) of each output slice.
+    """
+    mean, std = _climatology(data, tstart, tend, time_axis, chunk_days, ddof, 12)
+    return mean, std, np.arange(1, 13)
+
+def anomaly(data, climatology, tstart: datetime = None, tend: datetime = None, std=None,
+            time_axis: int = 0, chunk_days: int = 31, out=None):
+    """
+    Subtract a daily or monthly climatology from daily data.
+
+    Parameters
+    ----------
+    data : np.ndarray, array-like or iterable
+        Daily, contiguous data in [tstart, tend] (inclusive), or an iterable of
+        (date, day_array) pairs, as for daily_climatology.
+    climatology : np.ndarray
+        Output of daily_climatology (366 days) or monthly_climatology
+        (12 months), with the calendar axis at `time_axis`.
+    tstart, tend : datetime.datetime
+        Inclusive range of the data. Not used for an iterable.
+    std : np.ndarray, optional
+        Standard deviation of the same climatology. If given, the standardized
+        anomaly (data - mean) / std is returned.
+    time_axis : int
+        Axis that represents time in `data` and in `climatology`.
+    chunk_days : int
+        Number of days read at once for on-disk arrays.
+    out : np.ndarray, optional
+        Array (or np.memmap) with the shape of `data` that receives the result.
+
+    Returns
+    -------
+    np.ndarray or generator
+        Anomaly with the shape of `data`. Float32 input stays float32.
+        For an iterable, a generator of (date, anomaly) pairs.
+    """
+    climatology = np.moveaxis(np.asarray(climatology), time_axis, 0)
+    n_slots = climatology.shape[0]
+    if n_slots not in (12, 366):
+        raise ValueError("climatology must have 366 days or 12 months along time_axis, got %d." % n_slots)
+    if std is not None:
+        std = np.moveaxis(np.asarray(std), time_axis, 0)
 
-    time_years = time_vec.astype('datetime64[Y]')
+    def _anomaly(dates, block):
+        slots = _calendar_slots(dates, n_slots)
+        res = block - climatology[slots]
+        if std is not None:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                res /= std[slots]
+        return res
 
-    out = np.empty((n_years,) + x.shape[1:], dtype=float)
-    for i, y in enumerate(year_labels):
-        sel = (time_years == y)
-        out[i] = np.nanmean(x[sel, ...], axis=0)
+    if not hasattr(data, 'shape'):
+        def _iter_anomaly():
+            for date, day in data:
+                block = np.asarray(np.ma.filled(day, np.nan))[np.newaxis]
+                yield date, _anomaly(np.array([np.datetime64(date, 'D')]), block)[0]
+        return _iter_anomaly()
 
-    yearly = np.moveaxis(out, 0, time_axis)
-    return yearly, year_labels
+    time_vec = _check_days(data, tstart, tend, time_axis)
+    if out is None:
+        dtype = data.dtype if np.issubdtype(data.dtype, np.floating) else np.dtype('float64')
+        out = np.empty(data.shape, dtype=np.result_type(dtype, climatology.dtype))
+    out_t = np.moveaxis(out, time_axis, 0)
+    for i0, block in _time_chunks(data, chunk_days, time_axis):
+        n = block.shape[0]
+        out_t[i0:i0 + n] = _anomaly(time_vec[i0:i0 + n], block)
+    return out
@@ -0,0 +1,165 @@
+import numpy as np
+
+from GINCCO_lib.modules.running_stats import RunningHistogram
+from GINCCO_lib.modules.helpers import _float_dtype, _time_chunks
+
+#############################
+'''
+This module computes quantiles (percentiles) over time without loading the full time series.
+
+List of functions:
+* temporal_quantile: quantile maps over time, exact or approximate
+
+Methods:
+* exact: the grid is cut into tiles of rows, small enough to hold the full
+  time series of one tile. Each tile is reduced with a partial sort (np.partition)
+  and the same linear interpolation as np.nanquantile.
+* histogram: the days are streamed once into a histogram of each grid point
+  (RunningHistogram), and the quantiles are read from the cumulative counts.
+  Memory does not depend on the number of days, and an iterable such as
+  iter_days(...) can be used.
+'''
+#############################
+
+
+def _partition_quantile(block, q):
+    """
+    Quantiles over axis 0 of a (T, P) block, ignoring NaN, with linear interpolation.
+
+    Columns are grouped by their number of valid values n, so each group is
+    reduced with a single np.partition at the needed order statistics
+    (NaN are placed at the end). Returns an array of shape (len(q), P).
+    """
+    n_valid = np.isfinite(block).sum(axis=0)
+    out = np.full((q.size, block.shape[1]), np.nan, dtype=np.float64)
+
+    for n in np.unique(n_valid):
+        if n == 0:
+            continue
+        cols = np.flatnonzero(n_valid == n)
+        pos = q * (n - 1)
+        lo = np.floor(pos).astype(int)
+        hi = np.ceil(pos).astype(int)
+        part = np.partition(block[:, cols], np.unique(np.r_[lo, hi]), axis=0)
+        v_lo = part[lo].astype(np.float64)
+        v_hi = part[hi].astype(np.float64)
+        out[:, cols] = v_lo + (pos - lo)[:, np.newaxis] * (v_hi - v_lo)
+
+    return out
+
+
+def _exact_quantile(data, q, time_axis, max_memory):
+    """Exact quantiles of array data, reading one tile of rows (all days) at a time."""
+    n_time = data.shape[time_axis]
+    space = tuple(n for k, n in enumerate(data.shape) if k != time_axis)
+    dtype = _float_dtype(data)
+
+    if not space:
+        block = np.asarray(np.ma.filled(data[:], np.nan), dtype=dtype)[:, np.newaxis]
+        return _partition_quantile(block, q).reshape(q.shape).astype(dtype, copy=False)
+
+    # Number of rows (first spatial axis) of one tile
+    row_points = int(np.prod(space[1:], dtype=np.int64))
+    row_bytes = max(1, n_time * row_points * dtype.itemsize)
+    rows = max(1, min(space[0], int(max_memory // row_bytes)))
+    row_axis = 1 if time_axis == 0 else 0
+
+    out = np.empty((q.size,) + space, dtype=np.float64)
+    for j0 in range(0, space[0], rows):
+        j1 = min(j0 + rows, space[0])
+        index = [slice(None)] * len(data.shape)
+        index[row_axis] = slice(j0, j1)
+        tile = np.asarray(np.ma.filled(data[tuple(index)], np.nan), dtype=dtype)
+        tile = np.moveaxis(tile, time_axis, 0).reshape(n_time, -1)
+        out[:, j0:j1] = _partition_quantile(tile, q.ravel()).reshape((q.size, j1 - j0) + space[1:])
+
+    return out.reshape(q.shape + space).astype(dtype, copy=False)
+
+
+def _histogram_quantile(data, q, time_axis, chunk_days, bins, range):
+    """Approximate quantiles from a histogram of each grid point, in one pass over the days."""
+    if hasattr(data, 'shape'):
+        if range is None:
+            # First pass for the range of the data
+            lo, hi = np.inf, -np.inf
+            for _, block in _time_chunks(data, chunk_days, time_axis):
+                if np.isfinite(block).any():
+                    lo = min(lo, np.nanmin(block))
+                    hi = max(hi, np.nanmax(block))
+            if not lo < hi:
+                hi = lo + 1.0 if np.isfinite(lo) else 1.0
+                lo = lo if np.isfinite(lo) else 0.0
+            range = (lo, hi)
+        days = (day for _, block in _time_chunks(data, chunk_days, time_axis) for day in block)
+    else:
+        if range is None:
+            raise ValueError("range is required with method='histogram' and an iterable of days.")
+        days = (day for _, day in data)
+
+    hist = RunningHistogram(bins, range=range, per_point=True, ignore_missing='True')
+    for day in days:
+        hist.update(day)
+    return hist.quantile(q)
+
+
+def temporal_quantile(data, q, time_axis: int = 0, method: str = 'exact', max_memory: float = 256e6,
+                      chunk_days: int = 31, bins=256, range=None):
+    """
+    Compute quantiles over time of each grid point, ignoring NaN.
+
+    This gives the same result as np.nanquantile(data, q, axis=time_axis)
+    (method='exact'), without loading the full time series at once.
+
+    Parameters
+    ----------
+    data : np.ndarray, array-like or iterable
+        Input array with one axis for time. On-disk arrays (np.memmap, netCDF
+        variable, e.g. from import_4D(..., out=...)) are read by tiles or
+        chunks. With method='histogram', it can also be an iterable of
+        (date, day_array) pairs, e.g. iter_days(...).
+    q : float or array_like
+        Quantiles in [0, 1], e.g. [0.05, 0.5, 0.95] for the 5th, 50th and 95th percentiles.
+    time_axis : int
+        Axis that represents time in `data`.
+    method : str
+        'exact': partial sort of tiles of rows, holding all days of at most
+        `max_memory` bytes of data at a time.
+        'histogram': approximate quantiles (error of about one bin width)
+        from a histogram of each grid point, streaming the days once. Peak
+        memory is `bins` int32 counts per grid point, plus one chunk of days
+        while reading and about 20 MB of work memory to read the quantiles.
+    max_memory : float
+        Size in bytes of one tile for method='exact'. Default 256 MB.
+    chunk_days : int
+        Number of days read at once for method='histogram'.
+    bins : int or array_like
+        Number of bins in `range`, or the bin edges, for method='histogram'.
+    range : (float, float), optional
+        Range of the bins for method='histogram'. By default, the min and max
+        of the data (an extra pass). Required for an iterable.
+
+    Returns
+    -------
+    np.ndarray
+        Quantiles with shape q.shape + the spatial shape (time axis removed).
+        Float32 input stays float32.
+
+    Examples
+    --------
+    >>> p05, p50, p95 = temporal_quantile(sst, [0.05, 0.5, 0.95])
+    >>> days = iter_days(path, 'tem', tstart, tend, selector=np.s_[:, -1, :, :])
+    >>> p95 = temporal_quantile(days, 0.95, method='histogram', bins=400, range=(15, 35))
+    """
+    q = np.asarray(q, dtype=float)
+    if np.any((q < 0) | (q > 1)):
+        raise ValueError("Quantiles must be in the range [0, 1].")
+
+    method = str(method).lower()
+    if method == 'histogram':
+        return _histogram_quantile(data, q, time_axis, chunk_days, bins, range)
+    if method != 'exact':
+        raise ValueError("method must be 'exact' or 'histogram'.")
+    if not hasattr(data, 'shape'):
+        raise ValueError("method='exact' needs an array. Use method='histogram' for an iterable of days.")
+    time_axis = time_axis % len(data.shape)
+    return _exact_quantile(data, q, time_axis, max_memory)
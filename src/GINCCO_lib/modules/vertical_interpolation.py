@@ -1,8 +1,104 @@
 import numpy as np
 
 
+def depth_weights(depth_3d, target_depth):
+    """Build the vertical interpolation weights to one or several target depths.
+
+    For each (j, i) column, the target depth is bracketed by the nearest
+    shallower level ``k_shallow`` and the nearest deeper level ``k_deep``, so
+    that ``w_shallow * data[k_shallow] + w_deep * data[k_deep]`` is the linear
+    interpolation at the target depth. All columns and all target depths are
+    handled in one pass over the levels.
+
+    Parameters
+    ----------
+    depth_3d : ndarray
+        Depth values with shape (nz, ny, nx), conventionally negative below sea level.
+    target_depth : float or array_like
+        Requested depth(s). Positive values are converted to negative values.
+
+    Returns
+    -------
+    k_shallow, k_deep : ndarray of int
+        Level indices with shape (ny, nx), or (n_depth, ny, nx) if
+        target_depth is an array.
+    w_shallow, w_deep : ndarray of float
+        Weights with the same shape. They are NaN for columns that cannot be
+        interpolated (target out of the column or no bracketing levels).
+    """
+    depth_3d = np.asarray(np.ma.filled(depth_3d, np.nan), dtype=float)
+    if depth_3d.ndim != 3:
+        raise ValueError("depth_3d must be a 3D array (nz, ny, nx).")
+
+    # Shape (n_depth, 1, 1) so that every target is compared with every column
+    depth = -np.abs(np.asarray(target_depth, dtype=float))
+    targets = depth.reshape(-1, 1, 1)
+    out_shape = depth.shape + depth_3d.shape[1:]
+
+    # Nearest deeper level: the largest depth value that is <= target (e.g. -10 for -5).
+    # Nearest shallower level: the smallest depth value that is >= target (e.g. -3 for -5).
+    # Columns without candidate keep index 0, like a fully masked argmax/argmin.
+    shape = (targets.shape[0],) + depth_3d.shape[1:]
+    k_deep = np.zeros(shape, dtype=int)
+    k_shallow = np.zeros(shape, dtype=int)
+    z_deep = np.full(shape, -np.inf)
+    z_shallow = np.full(shape, np.inf)
+    for k in range(depth_3d.shape[0]):
+        z = depth_3d[k]
+        is_deep = (z <= targets) & (z > z_deep)
+        is_shallow = (z >= targets) & (z < z_shallow)
+        k_deep[is_deep] = k
+        z_deep = np.where(is_deep, z, z_deep)
+        k_shallow[is_shallow] = k
+        z_shallow = np.where(is_shallow, z, z_shallow)
+    z_deep = np.where(np.isinf(z_deep), depth_3d[0], z_deep)
+    z_shallow = np.where(np.isinf(z_shallow), depth_3d[0], z_shallow)
+    distance = z_deep - z_shallow
+
+    # Only take into account the columns that have two distinct bracketing levels
+    can_interpolate = (k_shallow != k_deep) & np.isfinite(distance) & (distance != 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        w_deep = np.where(can_interpolate, 1 + (targets - z_deep) / distance, np.nan)
+        w_shallow = np.where(can_interpolate, 1 - (targets - z_shallow) / distance, np.nan)
+
+    return (k_shallow.reshape(out_shape), k_deep.reshape(out_shape),
+            w_shallow.reshape(out_shape), w_deep.reshape(out_shape))
+
+
+def apply_depth_weights(data_3d, k_shallow, k_deep, w_shallow, w_deep):
+    """Interpolate a 3D field with the compact weights of :func:`depth_weights`.
+
+    Only the two bracketing levels of each column are gathered, the rest of the
+    column is never touched.
+
+    Parameters
+    ----------
+    data_3d : ndarray
+        Data values with shape (nz, ny, nx). It may also hold only a range of
+        levels, as long as k_shallow and k_deep are relative to that range.
+    k_shallow, k_deep, w_shallow, w_deep : ndarray
+        Compact weights with shape (ny, nx) or (n_depth, ny, nx), see :func:`depth_weights`.
+
+    Returns
+    -------
+    ndarray
+        Interpolated field with the shape of the weights. A NaN value on one of
+        the two levels is ignored (as np.nansum does), columns that cannot be
+        interpolated are NaN.
+    """
+    shape = np.shape(k_deep)
+    n_depth = int(np.prod(shape[:-2], dtype=int))
+    value_shallow = np.take_along_axis(data_3d, np.reshape(k_shallow, (n_depth,) + shape[-2:]), axis=0)
+    value_deep = np.take_along_axis(data_3d, np.reshape(k_deep, (n_depth,) + shape[-2:]), axis=0)
+    value_shallow = value_shallow.reshape(shape)
+    value_deep = value_deep.reshape(shape)
+    data_interp = np.nan_to_num(w_shallow * value_shallow) + np.nan_to_num(w_deep * value_deep)
+    data_interp[~np.isfinite(w_deep)] = np.nan
+    return data_interp
+
+
 def interpolate_depth(data_3d, depth_3d, target_depth, mask_t=None):
-    """Interpolate a 3D field (nz, ny, nx) to one target depth.
+    """Interpolate a 3D field (nz, ny, nx) to one or several target depths.
 
     Parameters
     ----------
@@ -10,18 +106,21 @@ def interpolate_depth(data_3d, depth_3d, target_depth, mask_t=None):
         Data values with shape (nz, ny, nx).
     depth_3d : ndarray
         Depth values with shape (nz, ny, nx), conventionally negative below sea level.
-    target_depth : float
-        Requested depth. Positive values are converted to negative values.
+    target_depth : float or array_like
+        Requested depth(s). Positive values are converted to negative values.
     mask_t : ndarray, optional
         2D mask where 1/True is valid ocean and 0/False is invalid land.
 
     Returns
     -------
     ndarray
-        Interpolated 2D field with shape (ny, nx). Points that cannot be
-        interpolated are NaN.
+        Interpolated 2D field with shape (ny, nx), or (n_depth, ny, nx) if
+        target_depth is an array, in the floating dtype of
+        data_3d (float32 stays float32). Points that cannot be interpolated are NaN.
     """
-    data_3d = np.asarray(np.ma.filled(data_3d, np.nan), dtype=float)
+    data_3d = np.asarray(np.ma.filled(data_3d, np.nan))
+    if not np.issubdtype(data_3d.dtype, np.floating):
+        data_3d = data_3d.astype(float)
     depth_3d = np.asarray(np.ma.filled(depth_3d, np.nan), dtype=float)
 
     if data_3d.ndim != 3 or depth_3d.ndim != 3:
@@ -29,43 +128,17 @@ def interpolate_depth(data_3d, depth_3d, target_depth, mask_t=None):
     if data_3d.shape != depth_3d.shape:
         raise ValueError("data_3d and depth_3d must have the same shape.")
 
-    depth = -abs(float(target_depth))
-    nz, ny, nx = depth_3d.shape
-
-    deeper_candidates = np.ma.masked_where(depth_3d > depth, depth_3d)
-    deeper_idx = np.argmax(deeper_candidates, axis=0)
-
-    shallower_candidates = np.ma.masked_where(depth_3d < depth, depth_3d)
-    shallower_idx = np.argmin(shallower_candidates, axis=0)
-
-    weights = np.zeros((nz, ny, nx), dtype=float)
-    can_interpolate = np.zeros((ny, nx), dtype=bool)
-
-    for j in range(ny):
-        for i in range(nx):
-            k_shallow = shallower_idx[j, i]
-            k_deep = deeper_idx[j, i]
-            if k_shallow == k_deep:
-                continue
-
-            z_deep = depth_3d[k_deep, j, i]
-            z_shallow = depth_3d[k_shallow, j, i]
-            distance = z_deep - z_shallow
-            if distance == 0 or not np.isfinite(distance):
-                continue
-
-            weights[k_deep, j, i] = 1 + (depth - z_deep) / distance
-            weights[k_shallow, j, i] = 1 - (depth - z_shallow) / distance
-            can_interpolate[j, i] = True
+    k_shallow, k_deep, w_shallow, w_deep = depth_weights(depth_3d, target_depth)
+    w_shallow = w_shallow.astype(data_3d.dtype)
+    w_deep = w_deep.astype(data_3d.dtype)
 
-    data_interp = np.nansum(data_3d * weights, axis=0)
-    data_interp[np.all(np.isnan(data_3d), axis=0)] = np.nan
-    data_interp[~can_interpolate] = np.nan
+    data_interp = apply_depth_weights(data_3d, k_shallow, k_deep, w_shallow, w_deep)
+    data_interp[..., np.all(np.isnan(data_3d), axis=0)] = np.nan
 
     if mask_t is not None:
         mask_t = np.asarray(mask_t)
-        if mask_t.shape != data_interp.shape:
+        if mask_t.shape != data_interp.shape[-2:]:
             raise ValueError("mask_t must match the horizontal data shape.")
-        data_interp[mask_t == 0] = np.nan
+        data_interp[..., mask_t == 0] = np.nan
 
     return data_interp